@@ -0,0 +1,63 @@
+"""HTTP helpers shared by the benchmark scripts in this directory."""
+import json
+import os
+import random
+import time
+import urllib.error
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def request(url, data=None, ip=None, token=None, timeout=120):
+    """
+    GET, or POST `data` as JSON. Returns (status, body). A refused or reset connection — normal
+    when a server is saturated — comes back as status 0 instead of raising.
+    """
+    headers = {'Content-Type': 'application/json'}
+    if ip:
+        headers['X-Forwarded-For'] = ip
+    if token:
+        headers['Authorization'] = f'Bearer {token}'
+    body = json.dumps(data).encode() if data is not None else None
+    req = urllib.request.Request(url, data=body, headers=headers)
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            return resp.status, resp.read()
+    except urllib.error.HTTPError as exc:
+        return exc.code, exc.read()
+    except OSError:
+        return 0, b''
+
+
+def build_answers(survey, randomize=False):
+    """
+    Answers for every question of a public survey payload. By default the first option and a
+    fixed text, so runs are comparable; `randomize` picks options and texts at random.
+    """
+    answers = []
+    for q in survey['questions']:
+        if q['question_type'] == 'text':
+            text = random.choice(['good', 'fine', 'slow']) if randomize else 'benchmark answer'
+            answers.append({'question_id': q['id'], 'text_answer': text})
+        elif not q['options']:
+            continue
+        elif not randomize:
+            answers.append({'question_id': q['id'], 'option_ids': [q['options'][0]['id']]})
+        elif q['question_type'] == 'single':
+            answers.append({'question_id': q['id'], 'option_ids': [random.choice(q['options'])['id']]})
+        else:
+            picked = random.sample(q['options'], random.randint(1, len(q['options'])))
+            answers.append({'question_id': q['id'], 'option_ids': [o['id'] for o in picked]})
+    return answers
+
+
+def wait_until_up(url, ok_statuses=(200,), timeout=30):
+    """Poll `url` until it answers with one of `ok_statuses`."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status, _ = request(url, timeout=5)
+        if status in ok_statuses:
+            return
+        time.sleep(0.25)
+    raise RuntimeError(f'server at {url} did not come up')
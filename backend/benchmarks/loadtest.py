@@ -0,0 +1,256 @@
+#!/usr/bin/env python
+"""
+Concurrent load test against a local gunicorn.
+
+Seeds a survey (manage.py seed_survey), starts the app under gunicorn on
+localhost and drives a weighted mix of respondent and admin traffic from a
+pool of processes for a fixed duration. Every submit uses a fresh synthetic IP
+in X-Forwarded-For. The `dup_submit` operation instead reuses a handful of
+IPs on purpose, to exercise the unique (survey, ip_address) race in
+SubmitResponseView.
+
+Reports throughput, error rate and latency percentiles per operation. On
+PostgreSQL it also samples pg_stat_activity while the test runs and reports
+sessions waiting on locks per view. The server runs with
+LOADTEST_TAG_CONNECTIONS=True, so each session is labelled with its view.
+
+Throttles are raised for the run unless --keep-throttles is given. Data is
+written to whatever database the environment points at — use a scratch one.
+
+Usage (from backend/):
+    python benchmarks/loadtest.py --processes 8 --duration 60 \\
+        --mix view=40,submit=25,results=20,dup_submit=2,admin_results=6,export=4,reorder=3
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+
+from common import BACKEND_DIR, build_answers, request, wait_until_up
+
+DEFAULT_MIX = 'view=40,submit=25,results=20,dup_submit=2,admin_results=6,export=4,reorder=3'
+
+# Operation -> statuses that count as success
+OPERATIONS = {
+    'view':          {200},
+    'submit':        {201},
+    # A 400 "already submitted" is the correct outcome of the race; a 500 is the bug
+    'dup_submit':    {201, 400},
+    'results':       {200},
+    'admin_results': {200},
+    'export':        {200},
+    'reorder':       {200},
+}
+
+UNTHROTTLED = {
+    'THROTTLE_IP_VIEW':       '1000000/s',
+    'THROTTLE_IP_SUBMIT':     '1000000/s',
+    'THROTTLE_SURVEY_VIEW':   '1000000/s',
+    'THROTTLE_SURVEY_SUBMIT': '1000000/s',
+}
+
+
+def parse_mix(mix):
+    weights = {}
+    for part in mix.split(','):
+        name, weight = part.split('=')
+        if name not in OPERATIONS:
+            raise SystemExit(f'unknown operation {name!r}, choose from {", ".join(OPERATIONS)}')
+        weights[name] = float(weight)
+    return weights
+
+
+def worker(index, args, token, survey, deadline):
+    """One load process. Returns {operation: {'latencies': [...], 'statuses': Counter}}."""
+    random.seed(os.getpid())
+    base = f'http://127.0.0.1:{args.port}/api'
+    weights = parse_mix(args.mix)
+    names, odds = list(weights), list(weights.values())
+    question_ids = [q['id'] for q in survey['questions']]
+    stats = defaultdict(lambda: {'latencies': [], 'statuses': Counter()})
+    n = 0
+
+    while time.time() < deadline:
+        op = random.choices(names, odds)[0]
+        n += 1
+        # Unique per process and request: 10.<process>.<n high>.<n low>, 100.64.0.x for the race
+        ip = f'{10 + index}.{(n >> 16) & 255}.{(n >> 8) & 255}.{n & 255}'
+        start = time.perf_counter()
+        if op == 'view':
+            status, _ = request(f'{base}/public/surveys/{args.slug}/', ip=ip)
+        elif op in ('submit', 'dup_submit'):
+            if op == 'dup_submit':
+                ip = f'100.64.0.{random.randrange(args.dup_ips)}'
+            status, _ = request(f'{base}/public/surveys/{args.slug}/submit/',
+                                {'answers': build_answers(survey, randomize=True)}, ip=ip)
+        elif op == 'results':
+            status, _ = request(f'{base}/surveys/{args.slug}/results/', ip=ip)
+        elif op == 'admin_results':
+            status, _ = request(f'{base}/surveys/{args.slug}/results/', token=token)
+        elif op == 'export':
+            status, _ = request(f'{base}/surveys/{survey["id"]}/export/csv/', token=token)
+        else:
+            order = question_ids[:]
+            random.shuffle(order)
+            status, _ = request(f'{base}/surveys/{survey["id"]}/questions/reorder/',
+                                {'order': order}, token=token)
+        stats[op]['latencies'].append(time.perf_counter() - start)
+        stats[op]['statuses'][status] += 1
+
+    return {op: {'latencies': s['latencies'], 'statuses': dict(s['statuses'])} for op, s in stats.items()}
+
+
+class LockSampler(threading.Thread):
+    """Polls pg_stat_activity and counts sessions waiting on locks, grouped by tagged view."""
+
+    def __init__(self, interval):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.samples = 0
+        self.waits = Counter()
+        self.peak = Counter()
+        self.stopped = threading.Event()
+
+    def run(self):
+        from django.db import connection
+        query = ("SELECT application_name, count(*) FROM pg_stat_activity "
+                 "WHERE datname = current_database() AND wait_event_type = 'Lock' "
+                 "GROUP BY application_name")
+        with connection.cursor() as cursor:
+            while not self.stopped.is_set():
+                cursor.execute(query)
+                self.samples += 1
+                for app, count in cursor.fetchall():
+                    view = app[len('view:'):] if app.startswith('view:') else app or '(untagged)'
+                    self.waits[view] += count
+                    self.peak[view] = max(self.peak[view], count)
+                time.sleep(self.interval)
+        connection.close()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def manage(*argv, env):
+    subprocess.run([sys.executable, 'manage.py', *argv], cwd=BACKEND_DIR, env=env, check=True)
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--slug', default='loadtest')
+    parser.add_argument('--questions', type=int, default=10)
+    parser.add_argument('--seed-responses', type=int, default=0,
+                        help='responses inserted before the run, for realistic table sizes')
+    parser.add_argument('--reseed', action='store_true', help='rebuild the survey even if it exists')
+    parser.add_argument('--processes', type=int, default=4, help='load-generating processes')
+    parser.add_argument('--duration', type=float, default=30, help='seconds of load')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='operation=weight,...')
+    parser.add_argument('--dup-ips', type=int, default=5, help='IP pool size for dup_submit')
+    parser.add_argument('--workers', type=int, default=4, help='gunicorn workers')
+    parser.add_argument('--asgi', action='store_true', help='serve config.asgi with uvicorn workers')
+    parser.add_argument('--port', type=int, default=8800)
+    parser.add_argument('--lock-interval', type=float, default=0.1, help='seconds between lock samples')
+    parser.add_argument('--keep-throttles', action='store_true')
+    args = parser.parse_args()
+    parse_mix(args.mix)
+
+    env = dict(os.environ)
+    env.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    env['LOADTEST_TAG_CONNECTIONS'] = 'True'
+    if not args.keep_throttles:
+        env.update(UNTHROTTLED)
+    if args.asgi:
+        env['ASYNC_PUBLIC_VIEWS'] = 'True'
+
+    manage('migrate', '--noinput', '-v0', env=env)
+    seed = ['seed_survey', args.slug, '--questions', str(args.questions),
+            '--responses', str(args.seed_responses), '--admin', 'loadtest-admin', '--password', 'loadtest']
+    manage(*seed, *(['--replace'] if args.reseed else []), env=env)
+
+    app = ['config.asgi:application', '--worker-class', 'uvicorn_worker.UvicornWorker'] if args.asgi \
+        else ['config.wsgi:application', '--worker-class', 'sync']
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', *app, '--workers', str(args.workers),
+         '--bind', f'127.0.0.1:{args.port}', '--log-level', 'warning'],
+        cwd=BACKEND_DIR, env=env,
+    )
+    base = f'http://127.0.0.1:{args.port}'
+    sampler = None
+    try:
+        wait_until_up(f'{base}/api/dashboard/', ok_statuses=(200, 401))
+        status, body = request(f'{base}/api/auth/login/', {'username': 'loadtest-admin', 'password': 'loadtest'})
+        if status != 200:
+            raise RuntimeError(f'login failed: {status} {body[:200]!r}')
+        token = json.loads(body)['access']
+        status, body = request(f'{base}/api/public/surveys/{args.slug}/')
+        if status != 200:
+            raise RuntimeError(f'survey {args.slug} not served: {status}')
+        survey = json.loads(body)
+
+        os.environ.update(env)
+        import django
+        sys.path.insert(0, BACKEND_DIR)
+        django.setup()
+        from django.db import connection
+        if connection.vendor == 'postgresql':
+            sampler = LockSampler(args.lock_interval)
+            sampler.start()
+
+        deadline = time.time() + args.duration
+        start = time.perf_counter()
+        with multiprocessing.Pool(args.processes) as pool:
+            parts = pool.starmap(worker, [(i, args, token, survey, deadline) for i in range(args.processes)])
+        wall = time.perf_counter() - start
+    finally:
+        if sampler:
+            sampler.stop()
+        server.terminate()
+        server.wait()
+
+    merged = defaultdict(lambda: {'latencies': [], 'statuses': Counter()})
+    for part in parts:
+        for op, s in part.items():
+            merged[op]['latencies'].extend(s['latencies'])
+            merged[op]['statuses'].update(s['statuses'])
+
+    print(f"\n{'operation':<15}{'reqs':>8}{'req/s':>9}{'err %':>8}{'p50 ms':>9}{'p95 ms':>9}"
+          f"{'p99 ms':>9}{'max ms':>9}  statuses")
+    for op in OPERATIONS:
+        if op not in merged:
+            continue
+        s = merged[op]
+        lat = sorted(s['latencies'])
+        ok = OPERATIONS[op]
+        errors = sum(c for code, c in s['statuses'].items() if code not in ok)
+        codes = ' '.join(f'{code}:{c}' for code, c in sorted(s['statuses'].items()))
+        print(f"{op:<15}{len(lat):>8}{len(lat) / wall:>9.1f}{errors / len(lat) * 100:>8.1f}"
+              f"{statistics.median(lat) * 1000:>9.1f}{percentile(lat, 0.95) * 1000:>9.1f}"
+              f"{percentile(lat, 0.99) * 1000:>9.1f}{lat[-1] * 1000:>9.1f}  {codes}")
+
+    if sampler:
+        print(f'\nLock waits ({sampler.samples} samples every {args.lock_interval}s)')
+        print(f"{'view':<28}{'waiting (avg)':>14}{'peak':>6}")
+        for view, total in sampler.waits.most_common():
+            print(f'{view:<28}{total / max(sampler.samples, 1):>14.2f}{sampler.peak[view]:>6}')
+        if not sampler.waits:
+            print('no session waited on a lock')
+    else:
+        print('\nLock waits are only sampled on PostgreSQL.')
+
+
+if __name__ == '__main__':
+    main()
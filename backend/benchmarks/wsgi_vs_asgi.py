@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+"""
+Compare concurrent-respondent throughput of the WSGI and ASGI deployments.
+
+Starts gunicorn twice on this machine with the same worker count — once with
+sync workers on config.wsgi, once with uvicorn workers on config.asgi and
+ASYNC_PUBLIC_VIEWS=True — and drives the public survey flow (view survey,
+submit, view results) from a pool of concurrent respondents against each.
+
+Every respondent sends a unique X-Forwarded-For address so the one-response-
+per-IP rule does not reject submits. Responses are written to whatever
+database the environment points at, so run it against a scratch database.
+Raise the per-survey throttles (THROTTLE_SURVEY_VIEW, THROTTLE_SURVEY_SUBMIT)
+for the run, otherwise you are measuring the rate limit.
+
+Usage (from backend/):
+    python benchmarks/wsgi_vs_asgi.py --slug my-survey --concurrency 64 --respondents 2000
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from common import BACKEND_DIR, build_answers, request, wait_until_up
+
+SERVERS = {
+    'wsgi': ['config.wsgi:application', '--worker-class', 'sync'],
+    'asgi': ['config.asgi:application', '--worker-class', 'uvicorn_worker.UvicornWorker'],
+}
+
+
+def synthetic_ip(kind, n):
+    # 10.x.y.z for wsgi, 172.16-31.y.z for asgi, so the two runs never collide
+    if kind == 'wsgi':
+        return f'10.{(n >> 16) & 255}.{(n >> 8) & 255}.{n & 255}'
+    return f'172.{16 + ((n >> 16) & 15)}.{(n >> 8) & 255}.{n & 255}'
+
+
+def respondent(base, slug, kind, n):
+    """One full respondent flow. Returns (elapsed seconds, ok)."""
+    ip = synthetic_ip(kind, n)
+    start = time.perf_counter()
+    status, body = request(f'{base}/api/public/surveys/{slug}/', ip=ip)
+    if status != 200:
+        return time.perf_counter() - start, False
+    answers = build_answers(json.loads(body))
+    status, _ = request(f'{base}/api/public/surveys/{slug}/submit/', {'answers': answers}, ip=ip)
+    if status != 201:
+        return time.perf_counter() - start, False
+    status, _ = request(f'{base}/api/surveys/{slug}/results/', ip=ip)
+    return time.perf_counter() - start, status == 200
+
+
+def run(kind, args):
+    env = dict(os.environ)
+    env['ASYNC_PUBLIC_VIEWS'] = 'True' if kind == 'asgi' else 'False'
+    bind = f'127.0.0.1:{args.port}'
+    cmd = [sys.executable, '-m', 'gunicorn', *SERVERS[kind],
+           '--workers', str(args.workers), '--bind', bind, '--log-level', 'warning']
+    server = subprocess.Popen(cmd, cwd=BACKEND_DIR, env=env)
+    base = f'http://{bind}'
+    try:
+        wait_until_up(f'{base}/api/public/surveys/{args.slug}/')
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            results = list(pool.map(lambda n: respondent(base, args.slug, kind, n),
+                                    range(args.offset, args.offset + args.respondents)))
+        wall = time.perf_counter() - start
+    finally:
+        server.terminate()
+        server.wait()
+
+    latencies = sorted(r[0] for r in results)
+    errors = sum(1 for r in results if not r[1])
+    return {
+        'kind':        kind,
+        'respondents': len(results),
+        'errors':      errors,
+        'throughput':  len(results) / wall,
+        'p50_ms':      statistics.median(latencies) * 1000,
+        'p95_ms':      latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        'p99_ms':      latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--slug', required=True, help='slug of an active survey')
+    parser.add_argument('--concurrency', type=int, default=32, help='simultaneous respondents')
+    parser.add_argument('--respondents', type=int, default=500, help='respondent flows per server')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn workers for both servers')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--offset', type=int, default=0,
+                        help='first synthetic IP index, bump it to rerun against the same database')
+    args = parser.parse_args()
+
+    rows = [run(kind, args) for kind in ('wsgi', 'asgi')]
+
+    print(f"\n{'server':<8}{'flows':>8}{'errors':>8}{'flows/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for r in rows:
+        print(f"{r['kind']:<8}{r['respondents']:>8}{r['errors']:>8}{r['throughput']:>10.1f}"
+              f"{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['p99_ms']:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -25,6 +25,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
      'django.middleware.security.SecurityMiddleware',
+    'surveys.compression.CompressionMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -35,6 +36,10 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Tag DB sessions with the serving view (benchmarks/loadtest.py reads them back)
+if os.getenv('LOADTEST_TAG_CONNECTIONS', 'False') == 'True':
+    MIDDLEWARE.append('surveys.middleware.ConnectionTagMiddleware')
+
 ROOT_URLCONF = 'config.urls'
 
 TEMPLATES = [
@@ -54,6 +59,27 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'config.wsgi.application'
+ASGI_APPLICATION = 'config.asgi.application'
+
+# ── ASGI — serve the public survey flow from async views (set when running under uvicorn)
+ASYNC_PUBLIC_VIEWS = os.getenv('ASYNC_PUBLIC_VIEWS', 'False') == 'True'
+# Threads available to async views for blocking work such as PDF rendering
+BLOCKING_WORKERS = int(os.getenv('BLOCKING_WORKERS', '4'))
+
+# ── Approximate results — reservoir sizes for surveys with approximate_results on
+RESULTS_SAMPLE_SIZE     = int(os.getenv('RESULTS_SAMPLE_SIZE', '10000'))
+TEXT_ANSWER_SAMPLE_SIZE = int(os.getenv('TEXT_ANSWER_SAMPLE_SIZE', '200'))
+
+# ── Store each response's answers as one JSON document alongside the answer tables
+STORE_ANSWER_DOCUMENTS = os.getenv('STORE_ANSWER_DOCUMENTS', 'True') == 'True'
+
+# ── Bulk deletion — rows removed per DELETE statement by surveys/purge.py
+PURGE_BATCH_SIZE = int(os.getenv('PURGE_BATCH_SIZE', '5000'))
+# A job without progress for this long is taken over by the next runner (run_purges, or polling it)
+PURGE_STALE_SECONDS = int(os.getenv('PURGE_STALE_SECONDS', '300'))
+
+# ── Survey cloning — responses copied per batch by surveys/cloning.py
+CLONE_BATCH_SIZE = int(os.getenv('CLONE_BATCH_SIZE', '1000'))
 
 # DATABASES = {
 #     'default': {
@@ -115,6 +141,55 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        'surveys.renderers.MessagePackRenderer',
+    ),
+}
+
+# ── Compression — API responses at least this many bytes are brotli/gzip encoded
+# (brotli only when the `brotli` package is installed)
+COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', '1024'))
+GZIP_LEVEL        = int(os.getenv('GZIP_LEVEL', '6'))
+BROTLI_QUALITY    = int(os.getenv('BROTLI_QUALITY', '5'))
+
+# Seconds a rendered, compressed payload is served from the cache. Survey edits invalidate the
+# public survey payload at once; the counts inside it lag by at most this long.
+PUBLIC_SURVEY_CACHE_SECONDS = int(os.getenv('PUBLIC_SURVEY_CACHE_SECONDS', '300'))
+RESULTS_CACHE_SECONDS       = int(os.getenv('RESULTS_CACHE_SECONDS', '15'))
+
+# ── Cross-survey comparison — surveys per request, and how long a comparison is cached
+# (new responses show up after at most this long; editing a compared survey shows at once)
+COMPARE_MAX_SURVEYS      = int(os.getenv('COMPARE_MAX_SURVEYS', '20'))
+COMPARISON_CACHE_SECONDS = int(os.getenv('COMPARISON_CACHE_SECONDS', '300'))
+
+# ── Caches
+# The throttle cache holds the request counters for the public survey endpoints. LocMemCache is
+# per-process; with several gunicorn workers point it at a shared store. Redis keeps the limits
+# exact (atomic incr):
+#   THROTTLE_CACHE_BACKEND=django.core.cache.backends.redis.RedisCache THROTTLE_CACHE_LOCATION=redis://127.0.0.1:6379/1
+# The file and database backends work without extra services but let bursts slightly over the limit:
+#   THROTTLE_CACHE_BACKEND=django.core.cache.backends.filebased.FileBasedCache THROTTLE_CACHE_LOCATION=/tmp/dh-throttle
+#   THROTTLE_CACHE_BACKEND=django.core.cache.backends.db.DatabaseCache THROTTLE_CACHE_LOCATION=throttle_cache
+# (the database backend needs `python manage.py createcachetable`).
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'throttle': {
+        'BACKEND':  os.getenv('THROTTLE_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('THROTTLE_CACHE_LOCATION', 'survey-throttle'),
+    },
+}
+
+# ── Throttling — "<requests>/<period>" over a sliding window (see surveys/throttling.py).
+# survey_submit can be overridden per survey with Survey.submit_rate_limit.
+SURVEY_THROTTLE_RATES = {
+    'ip_view':       os.getenv('THROTTLE_IP_VIEW', '60/min'),
+    'ip_submit':     os.getenv('THROTTLE_IP_SUBMIT', '5/min'),
+    'survey_view':   os.getenv('THROTTLE_SURVEY_VIEW', '3000/min'),
+    'survey_submit': os.getenv('THROTTLE_SURVEY_SUBMIT', '600/min'),
 }
 
 # ── JWT
@@ -1,6 +1,30 @@
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Count
+from django.utils.functional import cached_property
 from .models import Survey, Question, AnswerOption, Response, Answer
 
+
+class EstimatedCountPaginator(Paginator):
+    """Uses PostgreSQL's row estimate for unfiltered changelists instead of a full COUNT(*)."""
+    # Below this many rows an exact count is cheap enough
+    threshold = 10000
+
+    @cached_property
+    def count(self):
+        qs = self.object_list
+        connection = connections[qs.db]
+        if connection.vendor == 'postgresql' and not qs.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+                               [qs.model._meta.db_table])
+                row = cursor.fetchone()
+            if row and row[0] > self.threshold:
+                return row[0]
+        return super().count
+
+
 class QuestionInline(admin.TabularInline):
     model = Question
     extra = 0
@@ -12,17 +36,51 @@ class AnswerOptionInline(admin.TabularInline):
 @admin.register(Survey)
 class SurveyAdmin(admin.ModelAdmin):
     list_display = ['title', 'slug', 'status', 'response_count', 'created_at']
+    list_select_related = ['created_by']
+    search_fields = ['title', 'slug']
+    date_hierarchy = 'created_at'
     inlines = [QuestionInline]
     prepopulated_fields = {'slug': ('title',)}
+    raw_id_fields = ['created_by']
+
+    def get_queryset(self, request):
+        # One grouped query instead of a COUNT per row
+        return super().get_queryset(request).annotate(responses_total=Count('responses'))
+
+    @admin.display(description='Responses', ordering='responses_total')
+    def response_count(self, obj):
+        return obj.response_count
 
 @admin.register(Question)
 class QuestionAdmin(admin.ModelAdmin):
     list_display = ['text', 'survey', 'question_type', 'order', 'is_required']
+    list_select_related = ['survey']
+    search_fields = ['text']
+    autocomplete_fields = ['survey']
     inlines = [AnswerOptionInline]
 
+@admin.register(AnswerOption)
+class AnswerOptionAdmin(admin.ModelAdmin):
+    list_display = ['text', 'question', 'order']
+    list_select_related = ['question__survey']
+    search_fields = ['text']
+    autocomplete_fields = ['question']
+
 @admin.register(Response)
 class ResponseAdmin(admin.ModelAdmin):
     list_display = ['survey', 'ip_address', 'submitted_at']
+    list_select_related = ['survey']
+    search_fields = ['=ip_address']
+    date_hierarchy = 'submitted_at'
+    autocomplete_fields = ['survey']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
-admin.site.register(AnswerOption)
-admin.site.register(Answer)
+@admin.register(Answer)
+class AnswerAdmin(admin.ModelAdmin):
+    list_display = ['id', 'response', 'question']
+    list_select_related = ['response__survey', 'question__survey']
+    # Every FK/M2M here can point at millions of rows — never render them as selects
+    raw_id_fields = ['response', 'question', 'options']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
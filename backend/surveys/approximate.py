@@ -0,0 +1,319 @@
+"""
+Approximate results for very large surveys.
+
+Surveys with `approximate_results` switched on keep a ResultsSketch:
+  - a uniform reservoir sample of responses (ResponseSample), from which
+    option counts are estimated
+  - a reservoir sample of answers per open-text question (TextAnswerSample)
+  - HyperLogLog registers estimating the number of distinct respondents
+
+A submit only queues its response (ResultsSketchQueue) inside its own
+transaction, so busy surveys do not line up on the sketch row. Reading the
+results folds everything queued into the sketch in one locked batch first.
+
+Switching the flag on builds the sketch from the existing responses on a
+background thread. Until that finishes there is no sketch and the results
+stay exact. `manage.py build_results_sketch --missing` builds any that a
+restarted worker left unbuilt.
+
+Reading results then touches at most RESULTS_SAMPLE_SIZE responses no matter
+how many have been submitted. Intervals are 95% Wilson intervals with a finite
+population correction, so they collapse to the exact value while the whole
+survey still fits in the sample.
+"""
+import hashlib
+import logging
+import math
+import random
+import threading
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count
+
+from .models import Survey, Answer, ResultsSketch, ResultsSketchQueue, ResponseSample, TextAnswerSample
+from .text_analytics import top_terms
+
+logger = logging.getLogger(__name__)
+
+Z_95 = 1.96
+
+
+class HyperLogLog:
+    """Distinct-count estimator in 2**precision one-byte registers (4 KB, ~1.6% error by default)."""
+
+    def __init__(self, registers=b'', precision=12):
+        self.p = precision
+        self.m = 1 << precision
+        self.registers = bytearray(registers) if registers else bytearray(self.m)
+
+    def add(self, value):
+        h = int.from_bytes(hashlib.sha1(str(value).encode()).digest()[:8], 'big')
+        index = h >> (64 - self.p)
+        rest = h & ((1 << (64 - self.p)) - 1)
+        rank = (64 - self.p) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self):
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        estimate = alpha * self.m * self.m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * self.m and zeros:
+            # Small-range correction: linear counting is more accurate here
+            estimate = self.m * math.log(self.m / zeros)
+        return estimate
+
+    @property
+    def relative_error(self):
+        return 1.04 / math.sqrt(self.m)
+
+
+def _reservoir_slot(seen, size):
+    """Slot the `seen`-th item (1-based) takes in a reservoir of `size`, or None to drop it."""
+    if seen <= size:
+        return seen - 1
+    j = random.randrange(seen)
+    return j if j < size else None
+
+
+def queue_response(survey, response):
+    """Queue a response for the sketch. Call inside the submit transaction."""
+    ResultsSketchQueue.objects.create(survey=survey, response=response)
+
+
+def fold_queue(survey):
+    """Fold every queued response into the survey's sketch in one batch."""
+    if not ResultsSketchQueue.objects.filter(survey=survey).exists():
+        return
+
+    with transaction.atomic():
+        # A concurrent reader already folding holds the lock; its result is as good as ours
+        sketch = ResultsSketch.objects.select_for_update(skip_locked=True).filter(survey=survey).first()
+        if sketch is None:
+            return
+        queued = list(ResultsSketchQueue.objects.filter(survey=survey).order_by('id')
+                      .values_list('id', 'response_id', 'response__ip_address'))
+        if not queued:
+            return
+
+        hll = HyperLogLog(sketch.hll_registers)
+        slots = {}
+        for _, response_id, ip in queued:
+            hll.add(ip)
+            sketch.responses_seen += 1
+            slot = _reservoir_slot(sketch.responses_seen, settings.RESULTS_SAMPLE_SIZE)
+            if slot is not None:
+                slots[slot] = response_id
+
+        text_slots = {}
+        for answer_id, question_id in (Answer.objects
+                                       .filter(response_id__in=[r for _, r, _ in queued],
+                                               question__question_type='text')
+                                       .exclude(text_answer='').order_by('id')
+                                       .values_list('id', 'question_id')):
+            key = str(question_id)
+            sketch.text_seen[key] = sketch.text_seen.get(key, 0) + 1
+            slot = _reservoir_slot(sketch.text_seen[key], settings.TEXT_ANSWER_SAMPLE_SIZE)
+            if slot is not None:
+                text_slots[(question_id, slot)] = answer_id
+
+        # Replaced slots are deleted and re-inserted: two statements per table for the whole batch
+        ResponseSample.objects.filter(survey=survey, slot__in=slots).delete()
+        ResponseSample.objects.bulk_create(
+            [ResponseSample(survey=survey, slot=slot, response_id=rid) for slot, rid in slots.items()],
+            batch_size=1000,
+        )
+        for question_id in {q for q, _ in text_slots}:
+            TextAnswerSample.objects.filter(
+                question_id=question_id, slot__in=[slot for q, slot in text_slots if q == question_id]
+            ).delete()
+        TextAnswerSample.objects.bulk_create(
+            [TextAnswerSample(question_id=q, slot=slot, answer_id=aid) for (q, slot), aid in text_slots.items()],
+            batch_size=1000,
+        )
+
+        ResultsSketchQueue.objects.filter(id__in=[q[0] for q in queued]).delete()
+        sketch.hll_registers = bytes(hll.registers)
+        sketch.save()
+
+
+def approximate_results_changed(survey, was_enabled):
+    """
+    Call after saving a survey. Switching approximate results off drops the sketch, so a later
+    switch on never reuses a stale one; switching on builds it once the transaction commits.
+    """
+    if survey.approximate_results == was_enabled:
+        return
+    drop_sketch(survey)
+    if survey.approximate_results:
+        transaction.on_commit(
+            lambda: threading.Thread(target=_rebuild_in_background, args=(survey.pk,), daemon=True).start()
+        )
+
+
+def drop_sketch(survey):
+    with transaction.atomic():
+        ResultsSketch.objects.filter(survey=survey).delete()
+        ResponseSample.objects.filter(survey=survey).delete()
+        TextAnswerSample.objects.filter(question__survey=survey).delete()
+        ResultsSketchQueue.objects.filter(survey=survey).delete()
+
+
+def _rebuild_in_background(survey_id):
+    try:
+        survey = Survey.objects.filter(pk=survey_id, approximate_results=True).first()
+        if survey is not None:
+            rebuild_sketch(survey)
+    except Exception:
+        # Results stay exact; build_results_sketch --missing retries
+        logger.exception('Building the results sketch for survey %s failed', survey_id)
+    finally:
+        connection.close()
+
+
+def rebuild_sketch(survey):
+    """Recompute a survey's sketch from scratch in one pass over its responses."""
+    # Responses queued (so committed) by now are in the scan below. Ones queued while it runs
+    # stay queued and may be counted twice, which is well within the sketch's error
+    queued_before = list(ResultsSketchQueue.objects.filter(survey=survey).values_list('id', flat=True))
+    hll = HyperLogLog()
+    seen = 0
+    sample = []
+    for response_id, ip in (survey.responses.order_by('submitted_at', 'id')
+                            .values_list('id', 'ip_address').iterator(chunk_size=2000)):
+        seen += 1
+        hll.add(ip)
+        slot = _reservoir_slot(seen, settings.RESULTS_SAMPLE_SIZE)
+        if slot is None:
+            continue
+        if slot == len(sample):
+            sample.append(response_id)
+        else:
+            sample[slot] = response_id
+
+    text_seen = {}
+    text_sample = {}
+    for answer_id, question_id in (Answer.objects
+                                   .filter(question__survey=survey, question__question_type='text')
+                                   .exclude(text_answer='')
+                                   .order_by('id').values_list('id', 'question_id')
+                                   .iterator(chunk_size=2000)):
+        key = str(question_id)
+        text_seen[key] = text_seen.get(key, 0) + 1
+        slot = _reservoir_slot(text_seen[key], settings.TEXT_ANSWER_SAMPLE_SIZE)
+        if slot is None:
+            continue
+        slots = text_sample.setdefault(question_id, [])
+        if slot == len(slots):
+            slots.append(answer_id)
+        else:
+            slots[slot] = answer_id
+
+    with transaction.atomic():
+        ResultsSketch.objects.filter(survey=survey).delete()
+        ResponseSample.objects.filter(survey=survey).delete()
+        TextAnswerSample.objects.filter(question__survey=survey).delete()
+        ResultsSketchQueue.objects.filter(id__in=queued_before).delete()
+
+        sketch = ResultsSketch.objects.create(
+            survey=survey, responses_seen=seen, text_seen=text_seen,
+            hll_registers=bytes(hll.registers),
+        )
+        ResponseSample.objects.bulk_create(
+            [ResponseSample(survey=survey, slot=i, response_id=rid) for i, rid in enumerate(sample)],
+            batch_size=1000,
+        )
+        TextAnswerSample.objects.bulk_create(
+            [TextAnswerSample(question_id=qid, slot=i, answer_id=aid)
+             for qid, slots in text_sample.items() for i, aid in enumerate(slots)],
+            batch_size=1000,
+        )
+    return sketch
+
+
+def _proportion_interval(hits, sample, population):
+    """Point estimate and 95% Wilson interval for a proportion, with finite population correction."""
+    if sample == 0:
+        return 0.0, 0.0, 0.0
+    p = hits / sample
+    fpc = math.sqrt((population - sample) / (population - 1)) if population > 1 else 0.0
+    z = Z_95 * fpc
+    if z == 0:
+        return p, p, p
+    denom = 1 + z * z / sample
+    centre = (p + z * z / (2 * sample)) / denom
+    half = z * math.sqrt(p * (1 - p) / sample + z * z / (4 * sample * sample)) / denom
+    return p, max(0.0, centre - half), min(1.0, centre + half)
+
+
+def approximate_results(survey):
+    """Results payload estimated from the survey's sketch, or None if no sketch has been built."""
+    fold_queue(survey)
+    sketch = ResultsSketch.objects.filter(survey=survey).first()
+    if sketch is None:
+        return None
+
+    sample = ResponseSample.objects.filter(survey=survey)
+    sample_size = sample.count()
+    population = max(sketch.responses_seen, sample_size)
+
+    option_counts = dict(
+        Answer.options.through.objects
+        .filter(answer__response_id__in=sample.values('response_id'))
+        .values_list('answeroption_id')
+        .annotate(count=Count('id'))
+    )
+    text_answers = {}
+    for question_id, text in (TextAnswerSample.objects.filter(question__survey=survey)
+                              .order_by('slot').values_list('question_id', 'answer__text_answer')):
+        text_answers.setdefault(question_id, []).append(text)
+
+    # The term index covers every answer, so top terms stay exact here
+    terms = top_terms(survey)
+
+    hll = HyperLogLog(sketch.hll_registers)
+    distinct = hll.count()
+    distinct_margin = Z_95 * hll.relative_error * distinct
+
+    results = []
+    for question in survey.questions.prefetch_related('options'):
+        q_data = {
+            'id':            question.id,
+            'heading':       question.heading,
+            'text':          question.text,
+            'question_type': question.question_type,
+            'options':       [],
+            'text_answers':  [],
+        }
+
+        if question.question_type in ['single', 'multiple']:
+            for option in question.options.all():
+                p, low, high = _proportion_interval(option_counts.get(option.id, 0), sample_size, population)
+                q_data['options'].append({
+                    'id':         option.id,
+                    'text':       option.text,
+                    'count':      round(p * population),
+                    'percent':    round(p * 100, 1),
+                    'count_ci':   [round(low * population), round(high * population)],
+                    'percent_ci': [round(low * 100, 1), round(high * 100, 1)],
+                })
+        else:
+            q_data['text_answers'] = text_answers.get(question.id, [])
+            q_data['text_answers_total'] = sketch.text_seen.get(str(question.id), 0)
+            q_data['top_terms'] = terms.get(question.id, {'terms': [], 'bigrams': []})
+
+        results.append(q_data)
+
+    return {
+        'survey_title':     survey.title,
+        'total_responses':  population,
+        'approximate':      True,
+        'confidence_level': 0.95,
+        'sample_size':      sample_size,
+        'distinct_respondents': {
+            'estimate': round(distinct),
+            'ci':       [max(0, round(distinct - distinct_margin)), round(distinct + distinct_margin)],
+        },
+        'results':          results,
+    }
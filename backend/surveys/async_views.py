@@ -0,0 +1,199 @@
+import asyncio
+import json
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Count
+from django.http import Http404, HttpResponse, JsonResponse
+from django.shortcuts import aget_object_or_404
+from django.utils.cache import patch_vary_headers
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.renderers import JSONRenderer
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .models import Survey, Response
+from .compression import cached_render
+from .renderers import MessagePackRenderer
+from .serializers import SurveyDetailSerializer, ResponseSubmitSerializer
+from .throttling import SurveyViewThrottle, SurveySubmitThrottle
+from .utils import get_client_ip
+from .views import public_survey_key, render_results_pdf, results_payload, save_response
+
+
+# Blocking work (PDF rendering, anything without an async API) runs here so it
+# never stalls the event loop. The pool is bounded so a burst of exports cannot
+# open more DB connections than BLOCKING_WORKERS.
+_blocking_pool = ThreadPoolExecutor(max_workers=settings.BLOCKING_WORKERS,
+                                    thread_name_prefix='blocking')
+
+
+async def run_blocking(func, *args):
+    def call():
+        try:
+            return func(*args)
+        finally:
+            close_old_connections()
+    return await asyncio.get_running_loop().run_in_executor(_blocking_pool, call)
+
+
+async def authenticate(request):
+    """Resolve the JWT user for a plain Django request. Raises AuthenticationFailed on a bad token."""
+    result = await sync_to_async(JWTAuthentication().authenticate)(request)
+    return result[0] if result else None
+
+
+class AsyncAPIView(View):
+    """Base for async JSON endpoints. Like DRF's APIView, auth is token based so CSRF does not apply."""
+    throttle_classes = []
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        # Same contract as DRF throttles: checked before the handler does any ORM work
+        for throttle_class in self.throttle_classes:
+            throttle = throttle_class()
+            if not await sync_to_async(throttle.allow_request)(request, self):
+                wait = throttle.wait()
+                response = JsonResponse(
+                    {'detail': f'Request was throttled. Expected available in {math.ceil(wait)} seconds.'},
+                    status=429
+                )
+                response['Retry-After'] = str(math.ceil(wait))
+                return response
+        try:
+            return await super().dispatch(request, *args, **kwargs)
+        except Http404 as exc:
+            # DRF's body for the sync views, not Django's HTML page
+            return JsonResponse({'detail': str(exc)}, status=404)
+
+    def auth_failed_response(self, request, exc):
+        """The 401 DRF sends for `exc`. simplejwt's InvalidToken carries a dict detail, sent as-is."""
+        detail = exc.detail if isinstance(exc.detail, dict) else {'detail': exc.detail}
+        response = JsonResponse(detail, status=exc.status_code)
+        response['WWW-Authenticate'] = JWTAuthentication().authenticate_header(request)
+        return response
+
+    def negotiated_renderer(self, request):
+        """JSON, or MessagePack when the client asks for it the way DRF negotiates it."""
+        if (request.GET.get('format') == MessagePackRenderer.format
+                or MessagePackRenderer.media_type in request.headers.get('Accept', '')):
+            return MessagePackRenderer()
+        return JSONRenderer()
+
+    def payload_response(self, request, data, status=200):
+        renderer = self.negotiated_renderer(request)
+        response = HttpResponse(renderer.render(data), content_type=renderer.media_type, status=status)
+        patch_vary_headers(response, ['Accept'])
+        return response
+
+    async def cached_payload_response(self, request, key, build, timeout):
+        """The sync views' cached_response(): served from the shared rendered, compressed cache."""
+        return await sync_to_async(cached_render)(request, self.negotiated_renderer(request), key, build, timeout)
+
+
+# ─────────────────────────────────────────
+# PUBLIC — Survey by slug
+# ─────────────────────────────────────────
+
+class AsyncPublicSurveyView(AsyncAPIView):
+    throttle_classes = [SurveyViewThrottle]
+
+    async def get(self, request, slug):
+        survey = await aget_object_or_404(Survey, slug=slug, status='active')
+
+        def build():
+            # Only on a cache miss: the full tree in three queries
+            full = (Survey.objects
+                    .annotate(responses_total=Count('responses'))
+                    .prefetch_related('questions__options')
+                    .get(pk=survey.pk))
+            return SurveyDetailSerializer(full, context={'request': request}).data
+
+        return await self.cached_payload_response(
+            request, public_survey_key(request, survey), build, settings.PUBLIC_SURVEY_CACHE_SECONDS
+        )
+
+
+# ─────────────────────────────────────────
+# PUBLIC — Submit response
+# ─────────────────────────────────────────
+
+class AsyncSubmitResponseView(AsyncAPIView):
+    throttle_classes = [SurveySubmitThrottle]
+
+    async def post(self, request, slug):
+        survey = await aget_object_or_404(Survey, slug=slug, status='active')
+        ip = get_client_ip(request)
+
+        # Duplicate IP check
+        if await Response.objects.filter(survey=survey, ip_address=ip).aexists():
+            return JsonResponse(
+                {'detail': 'You have already submitted a response to this survey.'},
+                status=400
+            )
+
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError as exc:
+            return JsonResponse({'detail': f'JSON parse error - {exc}'}, status=400)
+        serializer = ResponseSubmitSerializer(data=data)
+        if not serializer.is_valid():
+            return JsonResponse(serializer.errors, status=400)
+
+        # The writes share one transaction, which Django only offers to sync code
+        await sync_to_async(save_response)(survey, ip, serializer.validated_data['answers'])
+        return JsonResponse({'detail': 'Response submitted successfully.'}, status=201)
+
+
+# ─────────────────────────────────────────
+# PUBLIC + ADMIN — Results
+# ─────────────────────────────────────────
+
+class AsyncSurveyResultsView(AsyncAPIView):
+
+    async def get(self, request, slug):
+        survey = await aget_object_or_404(Survey.objects.exclude(status='deleting'), slug=slug)
+
+        try:
+            user = await authenticate(request)
+        except AuthenticationFailed as exc:
+            return self.auth_failed_response(request, exc)
+
+        # If not admin and results hidden, block
+        if user is None and not survey.show_results:
+            return JsonResponse({'detail': 'Results are not public for this survey.'}, status=403)
+
+        if user is not None:
+            payload = await sync_to_async(results_payload)(survey, request.GET.get('mode') == 'exact')
+            return self.payload_response(request, payload)
+        return await self.cached_payload_response(
+            request, f'results:{survey.pk}', lambda: results_payload(survey), settings.RESULTS_CACHE_SECONDS
+        )
+
+
+# ─────────────────────────────────────────
+# ADMIN — Export PDF
+# ─────────────────────────────────────────
+
+class AsyncExportPDFView(AsyncAPIView):
+
+    async def get(self, request, pk):
+        try:
+            user = await authenticate(request)
+        except AuthenticationFailed as exc:
+            return self.auth_failed_response(request, exc)
+        if user is None:
+            return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+
+        survey = await aget_object_or_404(Survey, pk=pk)
+        pdf = await run_blocking(render_results_pdf, survey)
+        response = HttpResponse(pdf, content_type='application/pdf')
+        response['Content-Disposition'] = f'attachment; filename="{survey.slug}-results.pdf"'
+        return response
@@ -0,0 +1,125 @@
+"""
+Set-based survey copies.
+
+clone_survey() copies a survey's questions and options with one bulk INSERT
+per table, mapping each old id to its new id as it goes. With
+copy_responses=True the responses, answers and selected options follow in
+batches of CLONE_BATCH_SIZE, each batch a fixed handful of queries. The
+copied answer documents and text index point at the new ids. Everything runs
+in one transaction, so a failed clone leaves nothing behind.
+"""
+from django.conf import settings
+from django.db import transaction
+
+from .models import Survey, Question, AnswerOption, Response, Answer, TermFrequency
+from .approximate import rebuild_sketch
+
+AnswerOptions = Answer.options.through
+
+
+def _fit(text, suffix, field):
+    """`text` + `suffix`, with `text` cut so the result fits the Survey column `field`."""
+    return text[:Survey._meta.get_field(field).max_length - len(suffix)] + suffix
+
+
+def unique_slug(base):
+    """`base-copy`, then `base-copy-2`, ... — the first one not taken. A long `base` is cut to fit."""
+    # The part of `base` every candidate keeps, up to a 10-digit counter
+    stem = base[:Survey._meta.get_field('slug').max_length - len('-copy-') - 10]
+    taken = set(Survey.objects.filter(slug__startswith=stem).values_list('slug', flat=True))
+    slug, n = _fit(base, '-copy', 'slug'), 1
+    while slug in taken:
+        n += 1
+        slug = _fit(base, f'-copy-{n}', 'slug')
+    return slug
+
+
+def clone_survey(survey, user=None, title=None, slug=None, copy_responses=False):
+    """Copy `survey` as a new draft and return it."""
+    with transaction.atomic():
+        clone = Survey.objects.create(
+            title=title or _fit(survey.title, ' (copy)', 'title'),
+            slug=slug or unique_slug(survey.slug),
+            description=survey.description,
+            cover_image=survey.cover_image.name or None,
+            status='draft',
+            show_results=survey.show_results,
+            approximate_results=survey.approximate_results,
+            submit_rate_limit=survey.submit_rate_limit,
+            created_by=user,
+        )
+
+        questions = list(survey.questions.order_by('order', 'id'))
+        new_questions = Question.objects.bulk_create([
+            Question(survey=clone, heading=q.heading, text=q.text, question_type=q.question_type,
+                     order=q.order, is_required=q.is_required)
+            for q in questions
+        ])
+        question_map = {old.pk: new.pk for old, new in zip(questions, new_questions)}
+
+        options = list(AnswerOption.objects.filter(question__survey=survey).order_by('question_id', 'order', 'id'))
+        new_options = AnswerOption.objects.bulk_create([
+            AnswerOption(question_id=question_map[o.question_id], text=o.text, order=o.order)
+            for o in options
+        ])
+        option_map = {old.pk: new.pk for old, new in zip(options, new_options)}
+
+        if copy_responses:
+            _copy_responses(survey, clone, question_map, option_map)
+            TermFrequency.objects.bulk_create([
+                TermFrequency(question_id=question_map[t.question_id], n=t.n, term=t.term, count=t.count)
+                for t in TermFrequency.objects.filter(question__survey=survey)
+            ], batch_size=2000)
+
+    if clone.approximate_results:
+        rebuild_sketch(clone)
+    return clone
+
+
+def _copy_responses(survey, clone, question_map, option_map):
+    question_types = dict(Question.objects.filter(survey=clone).values_list('id', 'question_type'))
+    last_id = 0
+    while True:
+        # Keyset batches in id order, each a fixed number of queries however many answers there are
+        responses = list(Response.objects.filter(survey=survey, id__gt=last_id)
+                         .order_by('id')[:settings.CLONE_BATCH_SIZE])
+        if not responses:
+            return
+        last_id = responses[-1].pk
+        ids = [r.pk for r in responses]
+
+        answers = list(Answer.objects.filter(response_id__in=ids).order_by('id'))
+        selected = {}
+        for answer_id, option_id in (AnswerOptions.objects.filter(answer_id__in=[a.pk for a in answers])
+                                     .order_by('answeroption__order', 'answeroption_id')
+                                     .values_list('answer_id', 'answeroption_id')):
+            selected.setdefault(answer_id, []).append(option_map[option_id])
+
+        new_responses = Response.objects.bulk_create([
+            Response(survey=clone, ip_address=r.ip_address) for r in responses
+        ])
+        response_map = {old.pk: new for old, new in zip(responses, new_responses)}
+
+        new_answers = Answer.objects.bulk_create([
+            Answer(response_id=response_map[a.response_id].pk, question_id=question_map[a.question_id],
+                   text_answer=a.text_answer)
+            for a in answers
+        ])
+        AnswerOptions.objects.bulk_create([
+            AnswerOptions(answer_id=new.pk, answeroption_id=option_id)
+            for old, new in zip(answers, new_answers)
+            for option_id in selected.get(old.pk, [])
+        ])
+
+        docs = {new.pk: {} for new in new_responses}
+        for old, new in zip(answers, new_answers):
+            if question_types[new.question_id] == 'text':
+                docs[new.response_id][str(new.question_id)] = new.text_answer
+            else:
+                docs[new.response_id][str(new.question_id)] = selected.get(old.pk, [])
+
+        # submitted_at is auto_now_add, so the original times are written back afterwards
+        for old, new in zip(responses, new_responses):
+            new.submitted_at = old.submitted_at
+            new.answers_doc = docs[new.pk] if settings.STORE_ANSWER_DOCUMENTS else None
+        Response.objects.bulk_update(new_responses, ['submitted_at', 'answers_doc'])
@@ -0,0 +1,145 @@
+"""
+Side-by-side results for several runs of the same questionnaire.
+
+Choice questions are matched across surveys by their normalised text (case,
+punctuation and spacing ignored), or by an explicit mapping of
+{survey_id: question_id} rows. Options are matched by normalised text inside
+each matched question. Counts come from one grouped query over all surveys,
+so the query count is the same for two surveys or twenty:
+questions, options, response totals, option counts.
+"""
+import re
+
+from django.db.models import Count
+from rest_framework.exceptions import ValidationError
+
+from .models import Question, Response, Answer
+
+PUNCTUATION_RE = re.compile(r'[^\w\s]')
+
+
+def normalize(text):
+    return ' '.join(PUNCTUATION_RE.sub(' ', text.casefold()).split())
+
+
+def compare_surveys(surveys, mapping=None):
+    """
+    Comparison payload for `surveys`, in the order given — trends run first to last.
+    `mapping` is a list of {'label': str, 'questions': {survey_id: question_id}}; without it
+    questions are matched by text. Raises ValidationError for a mapping that does not fit.
+    """
+    survey_ids = [s.pk for s in surveys]
+    position = {survey_id: i for i, survey_id in enumerate(survey_ids)}
+
+    questions = list(Question.objects
+                     .filter(survey_id__in=survey_ids, question_type__in=['single', 'multiple'])
+                     .prefetch_related('options')
+                     .order_by('order', 'id'))
+    totals = dict(Response.objects.filter(survey_id__in=survey_ids).order_by()
+                  .values_list('survey_id').annotate(count=Count('id')))
+    option_counts = dict(Answer.options.through.objects
+                         .filter(answer__question__survey_id__in=survey_ids)
+                         .values_list('answeroption_id').annotate(count=Count('id')))
+
+    groups, unmatched = (_groups_from_mapping(questions, mapping, position) if mapping
+                         else _groups_by_text(questions, position))
+
+    rows = []
+    for label, members in groups:
+        columns = [None] * len(survey_ids)
+        for question in members:
+            columns[position[question.survey_id]] = question
+
+        options = {}
+        for i, question in enumerate(columns):
+            if question is None:
+                continue
+            for option in question.options.all():
+                entry = options.setdefault(normalize(option.text), {
+                    'text':       option.text,
+                    'option_ids': [None] * len(survey_ids),
+                    'counts':     [None] * len(survey_ids),
+                    'percents':   [None] * len(survey_ids),
+                })
+                total = totals.get(question.survey_id, 0)
+                count = option_counts.get(option.id, 0)
+                entry['option_ids'][i] = option.id
+                entry['counts'][i] = count
+                entry['percents'][i] = round(count / total * 100, 1) if total else 0
+
+        for entry in options.values():
+            present = [p for p in entry['percents'] if p is not None]
+            # Percentage points from the first survey that has the option to the last
+            entry['change'] = round(present[-1] - present[0], 1) if len(present) > 1 else None
+
+        first = next(q for q in columns if q is not None)
+        rows.append({
+            'label':         label,
+            'question_type': first.question_type,
+            'question_ids':  [q.id if q else None for q in columns],
+            'options':       list(options.values()),
+        })
+
+    return {
+        'surveys': [{
+            'id':              s.pk,
+            'title':           s.title,
+            'slug':            s.slug,
+            'created_at':      s.created_at,
+            'total_responses': totals.get(s.pk, 0),
+        } for s in surveys],
+        'questions': rows,
+        'unmatched': [{
+            'survey_id':   q.survey_id,
+            'question_id': q.id,
+            'text':        q.text,
+        } for q in unmatched],
+    }
+
+
+def _groups_by_text(questions, position):
+    """[(label, [question, ...])] for texts found in at least two surveys, plus the leftovers."""
+    by_text = {}
+    leftovers = []
+    for question in sorted(questions, key=lambda q: (position[q.survey_id], q.order, q.id)):
+        members = by_text.setdefault(normalize(question.text), [])
+        if any(m.survey_id == question.survey_id for m in members):
+            # The same text twice in one survey — only the first is compared
+            leftovers.append(question)
+        else:
+            members.append(question)
+
+    groups = []
+    for members in by_text.values():
+        if len(members) > 1:
+            groups.append((members[0].text, members))
+        else:
+            leftovers.extend(members)
+    return groups, leftovers
+
+
+def _mapping_error(message):
+    # Keyed like the serializer's errors for the same field
+    return ValidationError({'mapping': [message]})
+
+
+def _groups_from_mapping(questions, mapping, position):
+    by_id = {q.id: q for q in questions}
+    used = set()
+    groups = []
+    for row in mapping:
+        members = []
+        for survey_id, question_id in row['questions'].items():
+            if survey_id not in position:
+                raise _mapping_error(f'Survey {survey_id} in the mapping is not being compared.')
+            question = by_id.get(question_id)
+            if question is None or question.survey_id != survey_id:
+                raise _mapping_error(f'Question {question_id} is not a choice question of survey {survey_id}.')
+            if question_id in used:
+                raise _mapping_error(f'Question {question_id} is mapped more than once.')
+            used.add(question_id)
+            members.append(question)
+        if not members:
+            raise _mapping_error(f'Mapping row "{row["label"]}" has no questions.')
+        groups.append((row['label'], members))
+    return groups, [q for q in questions if q.id not in used]
@@ -0,0 +1,111 @@
+"""
+Response compression and pre-compressed payload caching.
+
+CompressionMiddleware brotli- or gzip-encodes API responses (JSON, MessagePack
+and CSV) above COMPRESS_MIN_SIZE, depending on what the client accepts. Brotli
+is used only when the optional `brotli` package is installed. HTML is left
+alone: admin pages carry the CSRF token next to reflected input, which
+compression would expose to BREACH.
+
+cached_response() serves payloads that many clients request with the same
+content, such as a public survey definition or its public results. It keeps
+them rendered and already compressed in the cache, once per format and
+encoding. A hit is then a cache read with no serializing and no compressing.
+The middleware passes such responses through, because they already carry a
+Content-Encoding.
+"""
+import gzip
+import re
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from rest_framework.response import Response as DRFResponse
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = ('application/json', 'application/msgpack', 'text/csv')
+
+ACCEPT_ENCODING_RE = re.compile(r'\s*([\w*-]+)\s*(?:;\s*q=([0-9.]+))?')
+
+
+def choose_encoding(request):
+    """'br', 'gzip' or None, from the request's Accept-Encoding."""
+    accepted = set()
+    for part in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        match = ACCEPT_ENCODING_RE.match(part)
+        if match and (match.group(2) is None or float(match.group(2)) > 0):
+            accepted.add(match.group(1).lower())
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+
+def compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=settings.BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=settings.GZIP_LEVEL)
+
+
+class CompressionMiddleware(MiddlewareMixin):
+
+    def process_response(self, request, response):
+        if (response.streaming
+                or response.has_header('Content-Encoding')
+                or response.status_code != 200
+                or not response.get('Content-Type', '').startswith(COMPRESSIBLE_TYPES)
+                or len(response.content) < settings.COMPRESS_MIN_SIZE):
+            return response
+
+        patch_vary_headers(response, ['Accept-Encoding'])
+        encoding = choose_encoding(request)
+        if encoding is None:
+            return response
+        body = compress(response.content, encoding)
+        if len(body) >= len(response.content):
+            return response
+        response.content = body
+        response['Content-Length'] = str(len(body))
+        response['Content-Encoding'] = encoding
+        return response
+
+
+def cached_response(request, view, key, build, timeout):
+    """
+    Render `build()` with the negotiated renderer, compress it for the client, and cache the
+    bytes under `key`. The browsable API is never cached.
+    """
+    renderer = request.accepted_renderer
+    if renderer.format not in ('json', 'msgpack'):
+        return DRFResponse(build())
+    return cached_render(request, renderer, key, build, timeout, view.get_renderer_context())
+
+
+def cached_render(request, renderer, key, build, timeout, renderer_context=None):
+    """cached_response() for a given renderer instance — what the async views call."""
+    encoding = choose_encoding(request)
+    cache_key = f'payload:{key}:{renderer.format}:{encoding or "identity"}'
+    entry = cache.get(cache_key)
+    if entry is None:
+        body = renderer.render(build(), renderer.media_type, renderer_context)
+        used = None
+        if encoding and len(body) >= settings.COMPRESS_MIN_SIZE:
+            compressed = compress(body, encoding)
+            if len(compressed) < len(body):
+                body, used = compressed, encoding
+        entry = (body, used)
+        cache.set(cache_key, entry, timeout)
+
+    body, used = entry
+    response = HttpResponse(body, content_type=renderer.media_type)
+    if used:
+        response['Content-Encoding'] = used
+    patch_vary_headers(response, ['Accept', 'Accept-Encoding'])
+    return response
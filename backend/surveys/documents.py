@@ -0,0 +1,64 @@
+"""
+Denormalized answer documents.
+
+Every Response can carry its answers as one JSON document (JSONB on
+PostgreSQL) shaped `{"<question_id>": [option_id, ...] | "text answer"}`,
+written in the submit transaction when STORE_ANSWER_DOCUMENTS is on.
+Readers such as ExportCSVView then scan Response alone instead of joining
+Answer, the Answer.options through table and AnswerOption per row.
+
+Responses saved before the column existed have a NULL document; readers fall
+back to the normalized tables for those, and `manage.py backfill_answer_documents`
+fills them in. The same fallback covers STORE_ANSWER_DOCUMENTS=False.
+"""
+from django.db.models import Prefetch
+
+from .models import Answer
+
+
+def answer_document(answers):
+    """Build the document from Answer objects with `question` and `options` loaded."""
+    doc = {}
+    for answer in answers:
+        if answer.question.question_type == 'text':
+            doc[str(answer.question_id)] = answer.text_answer
+        else:
+            doc[str(answer.question_id)] = [opt.id for opt in answer.options.all()]
+    return doc
+
+
+def with_answers(responses):
+    """Prefetch what answer_document() needs for a queryset of responses."""
+    return responses.prefetch_related(
+        Prefetch('answers', queryset=Answer.objects.select_related('question')),
+        'answers__options',
+    )
+
+
+def documents_for(responses):
+    """{response_id: document} built from the normalized tables — the fallback path."""
+    return {resp.pk: answer_document(resp.answers.all()) for resp in with_answers(responses)}
+
+
+def document_answers(doc, questions, option_text):
+    """
+    A document as a list of answers in question order — {question_id, option_ids, options,
+    text_answer} — given the survey's questions and an {option_id: text} map.
+    """
+    answers = []
+    for question in questions:
+        value = doc.get(str(question.id))
+        if value is None:
+            continue
+        if question.question_type == 'text':
+            answers.append({'question_id': question.id, 'option_ids': [], 'options': [], 'text_answer': value})
+        else:
+            # Options deleted since the response was saved are dropped, as the join would
+            option_ids = [opt_id for opt_id in value if opt_id in option_text]
+            answers.append({
+                'question_id': question.id,
+                'option_ids':  option_ids,
+                'options':     [option_text[opt_id] for opt_id in option_ids],
+                'text_answer': '',
+            })
+    return answers
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from surveys.documents import answer_document, with_answers
+from surveys.models import Response
+
+
+class Command(BaseCommand):
+    help = 'Write the denormalized answers_doc for responses that do not have one yet.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('slugs', nargs='*', help='Limit to these survey slugs')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        pending = Response.objects.filter(answers_doc__isnull=True).order_by('pk')
+        if options['slugs']:
+            pending = pending.filter(survey__slug__in=options['slugs'])
+
+        done = 0
+        last_pk = 0
+        while True:
+            batch = list(with_answers(pending.filter(pk__gt=last_pk))[:options['batch_size']])
+            if not batch:
+                break
+            for resp in batch:
+                resp.answers_doc = answer_document(resp.answers.all())
+            Response.objects.bulk_update(batch, ['answers_doc'])
+            last_pk = batch[-1].pk
+            done += len(batch)
+            self.stdout.write(f'{done} responses backfilled')
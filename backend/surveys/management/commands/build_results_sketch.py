@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from surveys.approximate import rebuild_sketch
+from surveys.models import Survey
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the approximate-results sample for surveys (all with approximate_results on by default).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('slugs', nargs='*', help='Survey slugs to rebuild')
+        parser.add_argument('--missing', action='store_true',
+                            help='Only surveys with approximate_results on and no sketch yet (safe to run from cron)')
+
+    def handle(self, *args, **options):
+        if options['slugs']:
+            surveys = Survey.objects.filter(slug__in=options['slugs'])
+            missing = set(options['slugs']) - set(surveys.values_list('slug', flat=True))
+            if missing:
+                raise CommandError(f"Unknown survey slug(s): {', '.join(sorted(missing))}")
+        else:
+            surveys = Survey.objects.filter(approximate_results=True)
+        if options['missing']:
+            surveys = surveys.filter(sketch__isnull=True)
+
+        for survey in surveys:
+            sketch = rebuild_sketch(survey)
+            self.stdout.write(f'{survey.slug}: sampled from {sketch.responses_seen} responses')
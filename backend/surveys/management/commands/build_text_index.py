@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from surveys.models import Survey
+from surveys.text_analytics import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the term and bigram frequency index for text questions (all surveys by default).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('slugs', nargs='*', help='Survey slugs to rebuild')
+
+    def handle(self, *args, **options):
+        surveys = Survey.objects.exclude(status='deleting')
+        if options['slugs']:
+            surveys = surveys.filter(slug__in=options['slugs'])
+            missing = set(options['slugs']) - set(surveys.values_list('slug', flat=True))
+            if missing:
+                raise CommandError(f"Unknown survey slug(s): {', '.join(sorted(missing))}")
+
+        for survey in surveys.filter(questions__question_type='text').distinct():
+            entries = rebuild_index(survey)
+            self.stdout.write(f'{survey.slug}: {entries} terms and bigrams indexed')
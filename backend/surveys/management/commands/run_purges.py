@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from surveys.models import SurveyPurge
+from surveys.purge import run_purge
+
+
+class Command(BaseCommand):
+    help = ('Run unfinished survey purge jobs in the foreground. Jobs another runner is still making '
+            'progress on are skipped, so this is safe to schedule (e.g. every few minutes from cron).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--failed', action='store_true', help='Retry failed jobs as well')
+
+    def handle(self, *args, **options):
+        statuses = ['pending', 'running'] + (['failed'] if options['failed'] else [])
+        for job in SurveyPurge.objects.filter(status__in=statuses).order_by('created_at'):
+            if not run_purge(job.pk, retry_failed=options['failed']):
+                self.stdout.write(f'{job}: running elsewhere, skipped')
+                continue
+            job.refresh_from_db()
+            self.stdout.write(f'{job}: {job.rows_deleted} rows deleted')
@@ -0,0 +1,94 @@
+import ipaddress
+import random
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from surveys.models import Survey, Question, AnswerOption, Response, Answer
+
+SEED_NETWORK = ipaddress.IPv6Address('2001:db8::')
+
+
+class Command(BaseCommand):
+    help = 'Create an active synthetic survey (and optionally responses and an admin user) for load tests.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('slug')
+        parser.add_argument('--questions', type=int, default=10)
+        parser.add_argument('--options', type=int, default=5, help='Options per choice question')
+        parser.add_argument('--text-every', type=int, default=4,
+                            help='Every Nth question is open text (0 for none)')
+        parser.add_argument('--responses', type=int, default=0, help='Pre-existing responses to insert')
+        parser.add_argument('--admin', help='Create or reset this staff user')
+        parser.add_argument('--password', default='loadtest')
+        parser.add_argument('--replace', action='store_true', help='Delete an existing survey with this slug first')
+
+    def handle(self, *args, **options):
+        slug = options['slug']
+        if options['admin']:
+            user, _ = User.objects.get_or_create(username=options['admin'], defaults={'is_staff': True})
+            user.is_staff = True
+            user.set_password(options['password'])
+            user.save()
+
+        existing = Survey.objects.filter(slug=slug).first()
+        if existing and not options['replace']:
+            self.stdout.write(f'{slug}: already exists, keeping it (use --replace to rebuild)')
+            return
+        if existing:
+            existing.delete()
+
+        with transaction.atomic():
+            survey = Survey.objects.create(title=f'Load test {slug}', slug=slug, status='active')
+            text_every = options['text_every']
+            questions = Question.objects.bulk_create([
+                Question(survey=survey, text=f'Question {i + 1}', order=i,
+                         question_type='text' if text_every and (i + 1) % text_every == 0
+                         else random.choice(['single', 'multiple']))
+                for i in range(options['questions'])
+            ])
+            AnswerOption.objects.bulk_create([
+                AnswerOption(question=q, text=f'Option {j + 1}', order=j)
+                for q in questions if q.question_type != 'text'
+                for j in range(options['options'])
+            ])
+
+        if options['responses']:
+            self.seed_responses(survey, options['responses'])
+
+        self.stdout.write(f'{slug}: {len(questions)} questions, {options["responses"]} responses')
+
+    def seed_responses(self, survey, count, batch_size=1000):
+        questions = list(survey.questions.prefetch_related('options'))
+        Through = Answer.options.through
+        for start in range(0, count, batch_size):
+            with transaction.atomic():
+                responses = Response.objects.bulk_create([
+                    # Addresses from the IPv6 documentation prefix never collide with real traffic
+                    Response(survey=survey, ip_address=str(SEED_NETWORK + n))
+                    for n in range(start, min(start + batch_size, count))
+                ])
+                answers = Answer.objects.bulk_create([
+                    Answer(response=r, question=q,
+                           text_answer=f'Synthetic answer {r.pk}' if q.question_type == 'text' else '')
+                    for r in responses for q in questions
+                ])
+                links = []
+                docs = {r.pk: {} for r in responses}
+                for answer in answers:
+                    doc = docs[answer.response_id]
+                    if answer.question.question_type == 'text':
+                        doc[str(answer.question_id)] = answer.text_answer
+                        continue
+                    opts = list(answer.question.options.all())
+                    picked = [random.choice(opts)] if answer.question.question_type == 'single' \
+                        else random.sample(opts, random.randint(1, len(opts)))
+                    picked.sort(key=lambda o: o.order)
+                    links.extend(Through(answer_id=answer.pk, answeroption_id=o.pk) for o in picked)
+                    doc[str(answer.question_id)] = [o.pk for o in picked]
+                Through.objects.bulk_create(links)
+
+                for r in responses:
+                    r.answers_doc = docs[r.pk]
+                Response.objects.bulk_update(responses, ['answers_doc'])
@@ -0,0 +1,24 @@
+from django.db import connection
+
+
+class ConnectionTagMiddleware:
+    """
+    Labels the PostgreSQL session with the view serving the request, so lock waits seen in
+    pg_stat_activity can be attributed per endpoint. Enabled by LOADTEST_TAG_CONNECTIONS —
+    it costs one extra statement per request, so it is meant for load tests only.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if connection.vendor != 'postgresql':
+            return None
+        view_class = getattr(view_func, 'view_class', None)
+        name = view_class.__name__ if view_class else view_func.__name__
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT set_config(%s, %s, false)', ['application_name', f'view:{name}'])
+        return None
@@ -0,0 +1,54 @@
+# Generated by Django 5.0.4 on 2026-10-19 14:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('surveys', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='survey',
+            name='approximate_results',
+            field=models.BooleanField(default=False, help_text='Serve results from a maintained sample. Run build_results_sketch after enabling on a survey with responses'),
+        ),
+        migrations.CreateModel(
+            name='ResultsSketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('responses_seen', models.PositiveBigIntegerField(default=0)),
+                ('text_seen', models.JSONField(default=dict)),
+                ('hll_registers', models.BinaryField(default=bytes)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('survey', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='sketch', to='surveys.survey')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ResponseSample',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slot', models.PositiveIntegerField()),
+                ('response', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='surveys.response')),
+                ('survey', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='response_sample', to='surveys.survey')),
+            ],
+            options={
+                'unique_together': {('survey', 'slot')},
+            },
+        ),
+        migrations.CreateModel(
+            name='TextAnswerSample',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slot', models.PositiveIntegerField()),
+                ('answer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='surveys.answer')),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='text_sample', to='surveys.question')),
+            ],
+            options={
+                'unique_together': {('question', 'slot')},
+            },
+        ),
+    ]
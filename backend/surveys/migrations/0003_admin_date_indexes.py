@@ -0,0 +1,23 @@
+# Generated by Django 5.0.4 on 2026-10-19 14:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('surveys', '0002_approximate_results'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='response',
+            name='submitted_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='survey',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
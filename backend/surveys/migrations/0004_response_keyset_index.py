@@ -0,0 +1,17 @@
+# Generated by Django 5.0.4 on 2026-10-19 14:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('surveys', '0003_admin_date_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='response',
+            index=models.Index(fields=['survey', '-submitted_at', '-id'], name='response_survey_keyset_idx'),
+        ),
+    ]
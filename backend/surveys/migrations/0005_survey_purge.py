@@ -0,0 +1,40 @@
+# Generated by Django 5.0.4 on 2026-10-19 14:06
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('surveys', '0004_response_keyset_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='survey',
+            name='status',
+            field=models.CharField(choices=[('draft', 'Draft'), ('active', 'Active'), ('closed', 'Closed'), ('deleting', 'Deleting')], default='draft', max_length=10),
+        ),
+        migrations.CreateModel(
+            name='SurveyPurge',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('survey_title', models.CharField(max_length=255)),
+                ('kind', models.CharField(choices=[('survey', 'Delete survey'), ('responses', 'Purge responses')], max_length=10)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('total_rows', models.PositiveBigIntegerField(default=0)),
+                ('rows_deleted', models.PositiveBigIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('survey', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='purges', to='surveys.survey')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
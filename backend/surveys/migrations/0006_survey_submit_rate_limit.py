@@ -0,0 +1,18 @@
+# Generated by Django 5.0.4 on 2026-10-19 14:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('surveys', '0005_survey_purge'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='survey',
+            name='submit_rate_limit',
+            field=models.PositiveIntegerField(blank=True, help_text='Max submissions per minute across all respondents. Empty uses the site default', null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.4 on 2026-10-19 14:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('surveys', '0006_survey_submit_rate_limit'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='response',
+            name='answers_doc',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.0.4 on 2026-10-19 14:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('surveys', '0007_response_answers_doc'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TermFrequency',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('n', models.PositiveSmallIntegerField()),
+                ('term', models.CharField(max_length=101)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='term_frequencies', to='surveys.question')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['question', 'n', '-count'], name='termfreq_top_idx')],
+                'unique_together': {('question', 'n', 'term')},
+            },
+        ),
+    ]
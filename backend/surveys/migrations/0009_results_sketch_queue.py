@@ -0,0 +1,22 @@
+# Generated by Django 5.0.4 on 2026-10-19 14:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('surveys', '0008_term_frequency'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResultsSketchQueue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('response', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='surveys.response')),
+                ('survey', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='surveys.survey')),
+            ],
+        ),
+    ]
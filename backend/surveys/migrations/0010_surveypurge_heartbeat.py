@@ -0,0 +1,18 @@
+# Generated by Django 5.0.4 on 2026-10-19 14:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('surveys', '0009_results_sketch_queue'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='surveypurge',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.4 on 2026-10-19 14:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('surveys', '0010_surveypurge_heartbeat'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='surveypurge',
+            name='high_water',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
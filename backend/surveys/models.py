@@ -8,6 +8,8 @@ class Survey(models.Model):
         ('draft',   'Draft'),
         ('active',  'Active'),
         ('closed',  'Closed'),
+        # Set while a SurveyPurge removes the survey in the background
+        ('deleting', 'Deleting'),
     ]
 
     title        = models.CharField(max_length=255)
@@ -16,8 +18,16 @@ class Survey(models.Model):
     cover_image  = models.ImageField(upload_to='survey_covers/', blank=True, null=True)
     status       = models.CharField(max_length=10, choices=STATUS_CHOICES, default='draft')
     show_results = models.BooleanField(default=True, help_text='Show results to respondents after submitting')
+    approximate_results = models.BooleanField(
+        default=False,
+        help_text='Serve results from a maintained sample. Run build_results_sketch after enabling on a survey with responses'
+    )
+    submit_rate_limit = models.PositiveIntegerField(
+        null=True, blank=True,
+        help_text='Max submissions per minute across all respondents. Empty uses the site default'
+    )
     created_by   = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
-    created_at   = models.DateTimeField(auto_now_add=True)
+    created_at   = models.DateTimeField(auto_now_add=True, db_index=True)
     updated_at   = models.DateTimeField(auto_now=True)
 
     class Meta:
@@ -28,6 +38,9 @@ class Survey(models.Model):
 
     @property
     def response_count(self):
+        # Querysets annotated with `responses_total` skip the extra COUNT query
+        if hasattr(self, 'responses_total'):
+            return self.responses_total
         return self.responses.count()
 
 
@@ -67,12 +80,18 @@ class AnswerOption(models.Model):
 class Response(models.Model):
     survey       = models.ForeignKey(Survey, related_name='responses', on_delete=models.CASCADE)
     ip_address   = models.GenericIPAddressField()
-    submitted_at = models.DateTimeField(auto_now_add=True)
+    submitted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    # {question_id: [option_ids] | text} — see surveys/documents.py. NULL until written or backfilled
+    answers_doc  = models.JSONField(null=True, blank=True)
 
     class Meta:
         ordering = ['-submitted_at']
         # One IP per survey
         unique_together = ['survey', 'ip_address']
+        indexes = [
+            # Keyset pagination in ResponseBrowserView
+            models.Index(fields=['survey', '-submitted_at', '-id'], name='response_survey_keyset_idx'),
+        ]
 
     def __str__(self):
         return f"Response to '{self.survey.title}' from {self.ip_address}"
@@ -88,3 +107,103 @@ class Answer(models.Model):
 
     def __str__(self):
         return f"Answer to Q{self.question.order}"
+
+
+# ─────────────────────────────────────────
+# Approximate results — see surveys/approximate.py
+# ─────────────────────────────────────────
+
+class ResultsSketch(models.Model):
+    survey         = models.OneToOneField(Survey, related_name='sketch', on_delete=models.CASCADE)
+    responses_seen = models.PositiveBigIntegerField(default=0)
+    # {question_id: non-empty text answers seen} — drives the per-question text reservoirs
+    text_seen      = models.JSONField(default=dict)
+    hll_registers  = models.BinaryField(default=bytes)
+    updated_at     = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Sketch for '{self.survey.title}' ({self.responses_seen} responses)"
+
+
+class ResultsSketchQueue(models.Model):
+    """A response submitted since its survey's sketch was last brought up to date."""
+    survey   = models.ForeignKey(Survey, related_name='+', on_delete=models.CASCADE)
+    response = models.OneToOneField(Response, related_name='+', on_delete=models.CASCADE)
+
+
+class ResponseSample(models.Model):
+    survey   = models.ForeignKey(Survey, related_name='response_sample', on_delete=models.CASCADE)
+    slot     = models.PositiveIntegerField()
+    response = models.ForeignKey(Response, related_name='+', on_delete=models.CASCADE)
+
+    class Meta:
+        unique_together = ['survey', 'slot']
+
+
+class TextAnswerSample(models.Model):
+    question = models.ForeignKey(Question, related_name='text_sample', on_delete=models.CASCADE)
+    slot     = models.PositiveIntegerField()
+    answer   = models.ForeignKey(Answer, related_name='+', on_delete=models.CASCADE)
+
+    class Meta:
+        unique_together = ['question', 'slot']
+
+
+class SurveyPurge(models.Model):
+    """Background bulk deletion of a survey, or of only its responses — see surveys/purge.py."""
+    KIND_CHOICES = [
+        ('survey',    'Delete survey'),
+        ('responses', 'Purge responses'),
+    ]
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done',    'Done'),
+        ('failed',  'Failed'),
+    ]
+
+    survey       = models.ForeignKey(Survey, related_name='purges', on_delete=models.SET_NULL, null=True)
+    survey_title = models.CharField(max_length=255)
+    kind         = models.CharField(max_length=10, choices=KIND_CHOICES)
+    status       = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    total_rows   = models.PositiveBigIntegerField(default=0)
+    rows_deleted = models.PositiveBigIntegerField(default=0)
+    # Touched by the runner after every batch; a running job with an old heartbeat lost its runner
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    # Highest response id when the job first ran; responses submitted after it are left alone
+    high_water   = models.BigIntegerField(null=True, blank=True)
+    error        = models.TextField(blank=True)
+    created_by   = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
+    created_at   = models.DateTimeField(auto_now_add=True)
+    finished_at  = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.get_kind_display()} '{self.survey_title}' ({self.status})"
+
+    @property
+    def progress(self):
+        if self.status == 'done':
+            return 100.0
+        if not self.total_rows:
+            return 0.0
+        return round(min(self.rows_deleted / self.total_rows, 1) * 100, 1)
+
+
+class TermFrequency(models.Model):
+    """Occurrences of a word (n=1) or word pair (n=2) across a text question's answers — see surveys/text_analytics.py."""
+    question = models.ForeignKey(Question, related_name='term_frequencies', on_delete=models.CASCADE)
+    n        = models.PositiveSmallIntegerField()
+    term     = models.CharField(max_length=101)
+    count    = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ['question', 'n', 'term']
+        indexes = [
+            models.Index(fields=['question', 'n', '-count'], name='termfreq_top_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.term} ({self.count})'
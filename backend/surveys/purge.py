@@ -0,0 +1,229 @@
+"""
+Set-based bulk deletion of surveys and their responses.
+
+survey.delete() lets Django's collector load every Response, Answer and
+Answer.options through row into memory before cascading. A SurveyPurge instead
+removes child tables bottom-up — through rows, answers, responses, then
+options and questions — with `DELETE ... WHERE id IN (batch)` statements, each
+batch in its own short transaction, recording progress on the job row as it
+goes.
+
+A `responses` purge leaves the survey open, so it only removes responses up to
+the highest id present when the job first ran (`high_water`). Each batch also
+clears the sketch queue and sample rows pointing at it, since submissions and
+sketch folds keep adding those while the job runs; the sketch is rebuilt from
+the surviving responses at the end.
+
+The job starts on a background thread of the web worker that created it. A
+recycled or killed worker takes that thread with it, so every batch also
+touches `heartbeat_at`. A job with no heartbeat for PURGE_STALE_SECONDS is
+taken over by the next runner: `manage.py run_purges` (schedule it, e.g. every
+few minutes from cron), or the admin polling the job, which restarts it.
+"""
+import datetime
+import logging
+import threading
+from functools import partial
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Max, Q
+from django.utils import timezone
+
+from .approximate import rebuild_sketch
+from .models import (
+    Survey, Question, AnswerOption, Response, Answer,
+    ResultsSketch, ResultsSketchQueue, ResponseSample, TextAnswerSample, SurveyPurge, TermFrequency,
+)
+
+logger = logging.getLogger(__name__)
+
+AnswerOptions = Answer.options.through
+
+
+def start_purge(survey, kind, user=None):
+    """
+    Create a purge job and run it on a background thread once the transaction commits.
+    If the survey already has an unfinished job, that job is returned instead (and restarted
+    if it has stalled).
+    """
+    with transaction.atomic():
+        survey = Survey.objects.select_for_update().get(pk=survey.pk)
+        job = survey.purges.filter(status__in=['pending', 'running']).first()
+        if job is not None:
+            resume_if_stalled(job)
+            return job
+        if kind == 'survey':
+            # Hides it from the public views and admin lists straight away
+            survey.status = 'deleting'
+            survey.save(update_fields=['status'])
+        job = SurveyPurge.objects.create(survey=survey, survey_title=survey.title, kind=kind, created_by=user)
+        transaction.on_commit(lambda: _run_in_background(job.pk))
+    return job
+
+
+def _run_in_background(job_id):
+    threading.Thread(target=run_purge, args=(job_id,), daemon=True).start()
+
+
+def _stale_cutoff():
+    return timezone.now() - datetime.timedelta(seconds=settings.PURGE_STALE_SECONDS)
+
+
+def stalled(jobs):
+    """Unfinished jobs in `jobs` that have made no progress for PURGE_STALE_SECONDS."""
+    cutoff = _stale_cutoff()
+    return jobs.filter(status__in=['pending', 'running']).filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, created_at__lt=cutoff)
+    )
+
+
+def resume_if_stalled(job):
+    if stalled(SurveyPurge.objects.filter(pk=job.pk)).exists():
+        logger.warning('Purge job %s stalled, restarting it', job.pk)
+        transaction.on_commit(lambda: _run_in_background(job.pk))
+
+
+def _claim(job_id, retry_failed):
+    """Mark the job running for this runner. False while another runner is making progress on it."""
+    claimable = Q(status='pending') | Q(status='running', heartbeat_at__isnull=True) \
+        | Q(status='running', heartbeat_at__lt=_stale_cutoff())
+    if retry_failed:
+        claimable |= Q(status='failed')
+    # A single UPDATE, so two runners racing for the same job cannot both win
+    return SurveyPurge.objects.filter(claimable, pk=job_id).update(
+        status='running', heartbeat_at=timezone.now(), error=''
+    ) == 1
+
+
+def run_purge(job_id, retry_failed=False):
+    """
+    Run (or resume) a purge job to completion. Safe to call from a thread or a command.
+    Returns False if the job was finished or another runner holds it.
+    """
+    try:
+        job = SurveyPurge.objects.get(pk=job_id)
+        if job.status == 'done':
+            return False
+        if not _claim(job.pk, retry_failed):
+            return False
+        survey_id = job.survey_id
+        if survey_id is None:
+            # The survey row went in the last step; only the status update was lost
+            SurveyPurge.objects.filter(pk=job.pk).update(status='done', finished_at=timezone.now())
+            return True
+        responses = Response.objects.filter(survey_id=survey_id)
+        answers = Answer.objects.filter(response__survey_id=survey_id)
+        high_water = _high_water(job)
+        if high_water is not None:
+            responses = responses.filter(pk__lte=high_water)
+            answers = answers.filter(response_id__lte=high_water)
+        SurveyPurge.objects.filter(pk=job.pk).update(
+            total_rows=job.rows_deleted + _count_rows(survey_id, job.kind, responses, answers)
+        )
+
+        # The sample and term tables hang off answers and questions; they are small, drop them first
+        TermFrequency.objects.filter(question__survey_id=survey_id).delete()
+        TextAnswerSample.objects.filter(question__survey_id=survey_id).delete()
+        ResponseSample.objects.filter(survey_id=survey_id).delete()
+        ResultsSketch.objects.filter(survey_id=survey_id).delete()
+        ResultsSketchQueue.objects.filter(survey_id=survey_id).delete()
+
+        _delete_in_batches(job, answers, dependents=[
+            partial(_delete_ids, AnswerOptions, 'answer_id'),
+            partial(_delete_ids, TextAnswerSample, 'answer_id'),
+        ])
+        _delete_in_batches(job, responses, dependents=[
+            partial(_delete_ids, ResultsSketchQueue, 'response_id'),
+            partial(_delete_ids, ResponseSample, 'response_id'),
+            # A submit that committed after the answers pass, with an id below high_water
+            _delete_answers_of,
+        ])
+
+        if job.kind == 'survey':
+            options = AnswerOption.objects.filter(question__survey_id=survey_id)
+            _delete_in_batches(job, options, dependents=[partial(_delete_ids, AnswerOptions, 'answeroption_id')])
+            _delete_in_batches(job, Question.objects.filter(survey_id=survey_id))
+            # Nothing left to cascade into, so the collector has no rows to load
+            Survey.objects.filter(pk=survey_id).delete()
+        else:
+            _rebuild_sketch(survey_id)
+
+        SurveyPurge.objects.filter(pk=job.pk).update(status='done', finished_at=timezone.now())
+        return True
+    except Exception as exc:
+        logger.exception('Purge job %s failed', job_id)
+        SurveyPurge.objects.filter(pk=job_id).update(status='failed', error=str(exc), finished_at=timezone.now())
+        return True
+    finally:
+        if threading.current_thread() is not threading.main_thread():
+            connection.close()
+
+
+def _high_water(job):
+    """The highest response id a `responses` job deletes, fixed the first time the job runs."""
+    if job.kind != 'responses':
+        # The survey is already hidden and closed to submissions
+        return None
+    if job.high_water is None:
+        highest = Response.objects.filter(survey_id=job.survey_id).aggregate(highest=Max('pk'))['highest']
+        # A runner resuming the job keeps the first value it recorded
+        SurveyPurge.objects.filter(pk=job.pk, high_water__isnull=True).update(high_water=highest or 0)
+        job.refresh_from_db(fields=['high_water'])
+    return job.high_water
+
+
+def _rebuild_sketch(survey_id):
+    survey = Survey.objects.filter(pk=survey_id, approximate_results=True).first()
+    if survey is None:
+        return
+    try:
+        rebuild_sketch(survey)
+    except Exception:
+        # The responses are gone either way; results stay exact and build_results_sketch --missing retries
+        logger.exception('Rebuilding the results sketch for survey %s failed', survey_id)
+
+
+def _count_rows(survey_id, kind, responses, answers):
+    total = (AnswerOptions.objects.filter(answer__in=answers).count()
+             + answers.count()
+             + responses.count())
+    if kind == 'survey':
+        total += (AnswerOption.objects.filter(question__survey_id=survey_id).count()
+                  + Question.objects.filter(survey_id=survey_id).count())
+    return total
+
+
+def _delete_ids(model, column, cursor, ids):
+    """`DELETE FROM <table> WHERE <column> IN (ids)` — returns the rows removed."""
+    quote = connection.ops.quote_name
+    placeholders = ', '.join(['%s'] * len(ids))
+    cursor.execute(f'DELETE FROM {quote(model._meta.db_table)} WHERE {quote(column)} IN ({placeholders})', ids)
+    return cursor.rowcount
+
+
+def _delete_answers_of(cursor, response_ids):
+    answer_ids = list(Answer.objects.filter(response_id__in=response_ids).values_list('pk', flat=True))
+    if not answer_ids:
+        return 0
+    return (_delete_ids(AnswerOptions, 'answer_id', cursor, answer_ids)
+            + _delete_ids(TextAnswerSample, 'answer_id', cursor, answer_ids)
+            + _delete_ids(Answer, 'id', cursor, answer_ids))
+
+
+def _delete_in_batches(job, queryset, dependents=()):
+    """
+    Delete `queryset` PURGE_BATCH_SIZE rows at a time. `dependents` are `f(cursor, ids)` callables
+    removing the rows that reference the batch; they run first in the same transaction.
+    """
+    model = queryset.model
+    while True:
+        ids = list(queryset.order_by().values_list('pk', flat=True)[:settings.PURGE_BATCH_SIZE])
+        if not ids:
+            return
+        with transaction.atomic(), connection.cursor() as cursor:
+            deleted = sum(delete(cursor, ids) for delete in dependents)
+            deleted += _delete_ids(model, model._meta.pk.column, cursor, ids)
+            SurveyPurge.objects.filter(pk=job.pk).update(
+                rows_deleted=F('rows_deleted') + deleted, heartbeat_at=timezone.now()
+            )
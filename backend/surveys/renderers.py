@@ -0,0 +1,36 @@
+import datetime
+import decimal
+import uuid
+
+from rest_framework.renderers import BaseRenderer
+
+
+def _msgpack_default(obj):
+    # Same fallbacks DRF's JSON encoder applies to values serializers leave unconverted
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, (decimal.Decimal, uuid.UUID)):
+        return str(obj)
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    if hasattr(obj, '__iter__'):
+        return list(obj)
+    raise TypeError(f'Cannot serialize {type(obj).__name__} to MessagePack')
+
+
+def packb(data):
+    import msgpack
+    return msgpack.packb(data, default=_msgpack_default, use_bin_type=True)
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Compact binary alternative to JSON, selected with `Accept: application/msgpack` or `?format=msgpack`."""
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return packb(data)
@@ -1,5 +1,7 @@
+from django.conf import settings
 from rest_framework import serializers
-from .models import Survey, Question, AnswerOption, Response, Answer
+from .models import Survey, Question, AnswerOption, Response, Answer, SurveyPurge
+from .documents import document_answers
 
 
 class AnswerOptionSerializer(serializers.ModelSerializer):
@@ -54,11 +56,36 @@ class SurveyDetailSerializer(serializers.ModelSerializer):
         return None
 
 
+class SurveyAdminDetailSerializer(SurveyDetailSerializer):
+    """SurveyDetailSerializer plus settings respondents should not see, such as the submit rate limit."""
+
+    class Meta(SurveyDetailSerializer.Meta):
+        fields = SurveyDetailSerializer.Meta.fields + ['approximate_results', 'submit_rate_limit']
+
+
 class SurveyWriteSerializer(serializers.ModelSerializer):
     """Used for create/update operations."""
     class Meta:
         model  = Survey
-        fields = ['title', 'description', 'slug', 'cover_image', 'status', 'show_results']
+        fields = ['title', 'description', 'slug', 'cover_image', 'status', 'show_results',
+                  'approximate_results', 'submit_rate_limit']
+
+    def validate_status(self, value):
+        if value == 'deleting':
+            raise serializers.ValidationError('Surveys are marked as deleting only by a delete request.')
+        if self.instance is not None and self.instance.status == 'deleting':
+            raise serializers.ValidationError('This survey is being deleted.')
+        return value
+
+
+class SurveyPurgeSerializer(serializers.ModelSerializer):
+    """Progress of a background survey deletion or response purge."""
+    progress = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model  = SurveyPurge
+        fields = ['id', 'survey', 'survey_title', 'kind', 'status', 'total_rows', 'rows_deleted',
+                  'progress', 'error', 'created_at', 'heartbeat_at', 'finished_at']
 
 
 class QuestionWriteSerializer(serializers.ModelSerializer):
@@ -90,6 +117,23 @@ class QuestionWriteSerializer(serializers.ModelSerializer):
         return instance
 
 
+class ResponseDocumentSerializer(serializers.ModelSerializer):
+    """
+    One response with all its answers, read from its answer document — used by the admin
+    response browser. Context: `questions` in order, `option_text` {id: text}, and `fallback`
+    {response_id: document} for responses saved without one.
+    """
+    answers = serializers.SerializerMethodField()
+
+    class Meta:
+        model  = Response
+        fields = ['id', 'ip_address', 'submitted_at', 'answers']
+
+    def get_answers(self, obj):
+        doc = obj.answers_doc if obj.answers_doc is not None else self.context['fallback'].get(obj.pk, {})
+        return document_answers(doc, self.context['questions'], self.context['option_text'])
+
+
 class AnswerSubmitSerializer(serializers.Serializer):
     question_id  = serializers.IntegerField()
     option_ids   = serializers.ListField(child=serializers.IntegerField(), required=False, default=[])
@@ -98,3 +142,41 @@ class AnswerSubmitSerializer(serializers.Serializer):
 
 class ResponseSubmitSerializer(serializers.Serializer):
     answers = AnswerSubmitSerializer(many=True)
+
+
+class SurveyCloneSerializer(serializers.Serializer):
+    """Options for copying a survey. Title and slug default to "<title> (copy)" and "<slug>-copy"."""
+    title          = serializers.CharField(max_length=255, required=False)
+    slug           = serializers.SlugField(max_length=120, required=False)
+    copy_responses = serializers.BooleanField(required=False, default=False)
+
+    def validate_slug(self, value):
+        if Survey.objects.filter(slug=value).exists():
+            raise serializers.ValidationError('A survey with this slug already exists.')
+        return value
+
+
+class QuestionMappingSerializer(serializers.Serializer):
+    label     = serializers.CharField()
+    # {survey_id: question_id}
+    questions = serializers.DictField(child=serializers.IntegerField())
+
+    def validate_questions(self, value):
+        # JSON object keys arrive as strings
+        try:
+            return {int(survey_id): question_id for survey_id, question_id in value.items()}
+        except ValueError:
+            raise serializers.ValidationError('Keys must be survey ids.')
+
+
+class SurveyComparisonSerializer(serializers.Serializer):
+    """Surveys to compare, oldest first. Questions are matched by text unless `mapping` is given."""
+    surveys = serializers.ListField(child=serializers.IntegerField(), min_length=2)
+    mapping = QuestionMappingSerializer(many=True, required=False)
+
+    def validate_surveys(self, value):
+        if len(set(value)) != len(value):
+            raise serializers.ValidationError('Each survey can be compared once.')
+        if len(value) > settings.COMPARE_MAX_SURVEYS:
+            raise serializers.ValidationError(f'At most {settings.COMPARE_MAX_SURVEYS} surveys can be compared.')
+        return value
@@ -0,0 +1,132 @@
+"""
+Incremental term and bigram frequencies for open-text questions.
+
+Each submitted text answer is tokenised (lower-cased words, English and
+Norwegian stop words removed) and its term and bigram counts are added to
+TermFrequency. The results payload and the PDF then read the top entries per
+question from that table, instead of re-scanning every answer.
+
+`manage.py build_text_index` rebuilds the counts from existing answers.
+"""
+import re
+from collections import Counter
+
+from django.db import connections, transaction
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+from .models import Answer, TermFrequency
+
+TOP_TERMS = 10
+
+# Letters only, so "æøå" stay inside words and digits/punctuation split them
+WORD_RE = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)?")
+
+ENGLISH_STOP_WORDS = frozenset('''
+a about above after again against all am an and any are as at be because been before being
+below between both but by can could did do does doing down during each few for from further
+had has have having he her here hers herself him himself his how i if in into is it its itself
+just me more most my myself no nor not now of off on once only or other our ours ourselves out
+over own same she should so some such than that the their theirs them themselves then there
+these they this those through to too under until up very was we were what when where which
+while who whom why will with would you your yours yourself yourselves i'm it's don't
+also get got really much many one lot
+'''.split())
+
+NORWEGIAN_STOP_WORDS = frozenset('''
+alle at av bare begge ble blei bli blir blitt både båe da de deg dei deim deira deires dem den
+denne der dere deres det dette di din disse ditt du dykk dykkar då eg ein eit eitt eller elles
+en enn er et ett etter for fordi fra før ha hadde han hans har hennar henne hennes her hjå ho
+hoe honom hoss hossen hun hva hvem hver hvilke hvilken hvis hvor hvordan hvorfor i ikke ikkje
+ingen ingi inkje inn inni ja jeg kan kom korleis korso kun kunne kva kvar kvarhelst kven kvi
+kvifor man mange me med medan meg meget mellom men mi min mine mitt mot mykje ned no noe noen
+noka noko nokon nokor nokre nå når og også om opp oss over på samme seg selv si sia sidan siden
+sin sine sitt sjøl skal skulle slik so som somme somt så sånn til um upp ut uten var vart varte
+ved vere verte vi vil ville vore vors vort vår være vært å litt veldig mer mye
+'''.split())
+
+STOP_WORDS = ENGLISH_STOP_WORDS | NORWEGIAN_STOP_WORDS
+
+
+def tokenize(text):
+    return [w for w in WORD_RE.findall(text.lower()) if len(w) > 1 and len(w) <= 50]
+
+
+def ngram_counts(text):
+    """Counter of (n, term) for terms and bigrams in one answer. Bigrams never span a stop word."""
+    tokens = tokenize(text)
+    counts = Counter()
+    for i, token in enumerate(tokens):
+        if token in STOP_WORDS:
+            continue
+        counts[(1, token)] += 1
+        if i + 1 < len(tokens) and tokens[i + 1] not in STOP_WORDS:
+            counts[(2, f'{token} {tokens[i + 1]}')] += 1
+    return counts
+
+
+def index_answers(answers):
+    """Add `(question_id, text)` pairs to the index."""
+    totals = Counter()
+    for question_id, text in answers:
+        for (n, term), count in ngram_counts(text).items():
+            totals[(question_id, n, term)] += count
+    if not totals:
+        return
+
+    # Sorted rows keep the lock order stable between concurrent submits
+    rows = sorted((q, n, term, count) for (q, n, term), count in totals.items())
+    connection = connections[TermFrequency.objects.db]
+    if connection.vendor in ('postgresql', 'sqlite'):
+        table = connection.ops.quote_name(TermFrequency._meta.db_table)
+        placeholders = ', '.join(['(%s, %s, %s, %s)'] * len(rows))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {table} (question_id, n, term, count) VALUES {placeholders} '
+                f'ON CONFLICT (question_id, n, term) DO UPDATE SET count = {table}.count + EXCLUDED.count',
+                [value for row in rows for value in row],
+            )
+        return
+
+    with transaction.atomic():
+        # Create missing rows at zero, then increment each one
+        TermFrequency.objects.bulk_create(
+            [TermFrequency(question_id=q, n=n, term=term, count=0) for q, n, term, _ in rows],
+            ignore_conflicts=True,
+        )
+        for question_id, n, term, count in rows:
+            TermFrequency.objects.filter(question_id=question_id, n=n, term=term) \
+                .update(count=F('count') + count)
+
+
+def rebuild_index(survey):
+    """Recount every text answer of a survey from scratch."""
+    totals = Counter()
+    answers = (Answer.objects.filter(question__survey=survey, question__question_type='text')
+               .exclude(text_answer='').values_list('question_id', 'text_answer').iterator(chunk_size=2000))
+    for question_id, text in answers:
+        for (n, term), count in ngram_counts(text).items():
+            totals[(question_id, n, term)] += count
+
+    with transaction.atomic():
+        TermFrequency.objects.filter(question__survey=survey).delete()
+        TermFrequency.objects.bulk_create(
+            [TermFrequency(question_id=q, n=n, term=term, count=c) for (q, n, term), c in totals.items()],
+            batch_size=2000,
+        )
+    return len(totals)
+
+
+def top_terms(survey, limit=TOP_TERMS):
+    """{question_id: {'terms': [...], 'bigrams': [...]}} in one windowed query."""
+    rows = (TermFrequency.objects.filter(question__survey=survey)
+            .annotate(rank=Window(RowNumber(), partition_by=[F('question_id'), F('n')],
+                                  order_by=[F('count').desc(), F('term').asc()]))
+            .filter(rank__lte=limit)
+            .order_by('question_id', 'n', 'rank')
+            .values_list('question_id', 'n', 'term', 'count'))
+    result = {}
+    for question_id, n, term, count in rows:
+        entry = result.setdefault(question_id, {'terms': [], 'bigrams': []})
+        entry['terms' if n == 1 else 'bigrams'].append({'term': term, 'count': count})
+    return result
@@ -0,0 +1,158 @@
+"""
+Sliding-window throttles for the public survey endpoints.
+
+Each request is counted against a per-IP limit and then a per-survey limit. A
+rate of "5/min" allows 5 requests in any minute, estimated from two
+fixed-window counters in the 'throttle' cache: the current minute's count plus
+the previous minute's, weighted by how much of it still overlaps the window.
+
+Counters only change through cache.add/incr/decr, so concurrent requests cannot
+both take the last slot: every request increments first and gives its slot back
+(decr) if that put the window over the limit. That holds where incr is atomic
+— LocMemCache within a process, and Redis or Memcached across workers. The
+file and database backends implement incr as get-then-set, so with those the
+limits are approximate under concurrency.
+
+Per limit checked, a request costs an add, a get and an incr, plus a decr when
+it is rejected; the allowed/rejected counter adds an add and an incr. No ORM
+work is done for a rejected request.
+
+Allowed/rejected counters per scope are kept in the same cache and served by
+ThrottleStatsView for monitoring.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+from .models import Survey
+from .utils import get_client_ip
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# How long a survey's submit_rate_limit is cached before it is read again
+SURVEY_LIMIT_TTL = 60
+
+SCOPES = ['ip_view', 'ip_submit', 'survey_view', 'survey_submit']
+
+
+def throttle_cache():
+    return caches['throttle']
+
+
+def parse_rate(rate):
+    """'5/min' -> (limit 5, period 60 seconds)."""
+    num, period = rate.split('/')
+    return int(num), PERIODS[period[0]]
+
+
+def _incr(cache, key, timeout):
+    cache.add(key, 0, timeout)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr()
+        cache.set(key, 1, timeout)
+        return 1
+
+
+def _count(scope, outcome):
+    _incr(throttle_cache(), f'throttle:count:{scope}:{outcome}', None)
+
+
+def throttle_stats():
+    cache = throttle_cache()
+    stats = {}
+    for scope in SCOPES:
+        stats[scope] = {
+            'rate':     settings.SURVEY_THROTTLE_RATES[scope],
+            'allowed':  cache.get(f'throttle:count:{scope}:allowed', 0),
+            'rejected': cache.get(f'throttle:count:{scope}:rejected', 0),
+        }
+    return stats
+
+
+def survey_submit_limit(slug):
+    """Survey.submit_rate_limit for a slug (0 if unset), read through the cache."""
+    cache = throttle_cache()
+    key = f'throttle:limit:{slug}'
+    limit = cache.get(key)
+    if limit is None:
+        limit = Survey.objects.filter(slug=slug).values_list('submit_rate_limit', flat=True).first() or 0
+        cache.set(key, limit, SURVEY_LIMIT_TTL)
+    return limit
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """Checks the per-IP limit, then the per-survey limit for the `slug` URL kwarg."""
+    ip_scope = None
+    survey_scope = None
+
+    def __init__(self):
+        self._wait = None
+
+    def get_survey_rate(self, slug):
+        return settings.SURVEY_THROTTLE_RATES[self.survey_scope]
+
+    def allow_request(self, request, view):
+        # IP first and stop at the first limit reached, so a flood from one IP neither
+        # uses up the survey's limit nor reaches the survey limit lookup
+        ip_rate = settings.SURVEY_THROTTLE_RATES[self.ip_scope]
+        if not self.spend(self.ip_scope, get_client_ip(request), ip_rate):
+            return False
+        slug = view.kwargs.get('slug')
+        if slug and not self.spend(self.survey_scope, slug, self.get_survey_rate(slug)):
+            return False
+        return True
+
+    def spend(self, scope, ident, rate):
+        allowed = self.take_slot(f'throttle:window:{scope}:{ident}', rate)
+        _count(scope, 'allowed' if allowed else 'rejected')
+        return allowed
+
+    def take_slot(self, key, rate):
+        limit, period = parse_rate(rate)
+        cache = throttle_cache()
+        now = time.time()
+        window, offset = divmod(now, period)
+        window = int(window)
+        overlap = 1 - offset / period
+
+        # Each counter is read as the previous window during the next one, then it can expire
+        current = _incr(cache, f'{key}:{window}', period * 2 + 1)
+        previous = cache.get(f'{key}:{window - 1}', 0)
+        if previous * overlap + current <= limit:
+            return True
+
+        try:
+            cache.decr(f'{key}:{window}')
+        except ValueError:
+            pass
+        current -= 1
+        if current >= limit or not previous:
+            self._wait = period - offset
+        else:
+            # Until the previous window's share has shrunk enough to leave one slot
+            needed_overlap = (limit - 1 - current) / previous
+            self._wait = max(0.0, (overlap - needed_overlap) * period)
+        return False
+
+    def wait(self):
+        return self._wait
+
+
+class SurveyViewThrottle(SlidingWindowThrottle):
+    ip_scope = 'ip_view'
+    survey_scope = 'survey_view'
+
+
+class SurveySubmitThrottle(SlidingWindowThrottle):
+    ip_scope = 'ip_submit'
+    survey_scope = 'survey_submit'
+
+    def get_survey_rate(self, slug):
+        limit = survey_submit_limit(slug)
+        if limit:
+            return f'{limit}/min'
+        return super().get_survey_rate(slug)
@@ -1,30 +1,53 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 from .user_views import UserListCreateView, UserDetailView
 
+if settings.ASYNC_PUBLIC_VIEWS:
+    from . import async_views
+    PublicSurveyView   = async_views.AsyncPublicSurveyView
+    SubmitResponseView = async_views.AsyncSubmitResponseView
+    SurveyResultsView  = async_views.AsyncSurveyResultsView
+    ExportPDFView      = async_views.AsyncExportPDFView
+else:
+    PublicSurveyView   = views.PublicSurveyView
+    SubmitResponseView = views.SubmitResponseView
+    SurveyResultsView  = views.SurveyResultsView
+    ExportPDFView      = views.ExportPDFView
+
 urlpatterns = [
     # Admin dashboard stats
     path('dashboard/', views.DashboardStatsView.as_view()),
+    path('throttle/stats/', views.ThrottleStatsView.as_view()),
 
     # Admin — Survey CRUD
     path('surveys/', views.SurveyListCreateView.as_view()),
     path('surveys/<int:pk>/', views.SurveyDetailView.as_view()),
+    path('surveys/<int:pk>/clone/', views.SurveyCloneView.as_view()),
 
     # Admin — Questions
     path('surveys/<int:survey_id>/questions/', views.QuestionCreateView.as_view()),
     path('surveys/<int:survey_id>/questions/reorder/', views.QuestionReorderView.as_view()),
     path('questions/<int:pk>/', views.QuestionDetailView.as_view()),
 
+    # Admin — Response browser
+    path('surveys/<int:pk>/responses/', views.ResponseBrowserView.as_view()),
+    path('surveys/<int:pk>/responses/purge/', views.SurveyPurgeResponsesView.as_view()),
+    path('purges/<int:pk>/', views.SurveyPurgeDetailView.as_view()),
+
     # Admin — Export
     path('surveys/<int:pk>/export/csv/', views.ExportCSVView.as_view()),
-    path('surveys/<int:pk>/export/pdf/', views.ExportPDFView.as_view()),
+    path('surveys/<int:pk>/export/pdf/', ExportPDFView.as_view()),
+
+    # Admin — Cross-survey comparison
+    path('surveys/compare/', views.SurveyComparisonView.as_view()),
 
     # Admin + Public — Results
-    path('surveys/<slug:slug>/results/', views.SurveyResultsView.as_view()),
+    path('surveys/<slug:slug>/results/', SurveyResultsView.as_view()),
 
     # Public — Survey view and submit
-    path('public/surveys/<slug:slug>/', views.PublicSurveyView.as_view()),
-    path('public/surveys/<slug:slug>/submit/', views.SubmitResponseView.as_view()),
+    path('public/surveys/<slug:slug>/', PublicSurveyView.as_view()),
+    path('public/surveys/<slug:slug>/submit/', SubmitResponseView.as_view()),
     # Admin — User management
     path('users/', UserListCreateView.as_view()),
     path('users/<int:pk>/', UserDetailView.as_view()),
@@ -1,28 +1,40 @@
+from django.conf import settings
+from django.db import transaction
 from django.shortcuts import get_object_or_404
-from django.db.models import Count
+from django.db.models import Count, Exists, OuterRef, Q
 from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response as DRFResponse
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
+import base64
 import csv
+import datetime
+import hashlib
 import io
-
-from .models import Survey, Question, AnswerOption, Response, Answer
+import json
+
+from .models import Survey, Question, AnswerOption, Response, Answer, SurveyPurge
+from .approximate import queue_response, approximate_results, approximate_results_changed
+from .cloning import clone_survey
+from .comparison import compare_surveys
+from .compression import cached_response
+from .documents import documents_for
+from .purge import start_purge, resume_if_stalled
+from .text_analytics import index_answers, top_terms
+from .throttling import SurveyViewThrottle, SurveySubmitThrottle, throttle_stats
+from .utils import get_client_ip
 from .serializers import (
-    SurveyListSerializer, SurveyDetailSerializer, SurveyWriteSerializer,
-    QuestionWriteSerializer, QuestionSerializer, ResponseSubmitSerializer
+    SurveyListSerializer, SurveyDetailSerializer, SurveyAdminDetailSerializer, SurveyWriteSerializer,
+    QuestionWriteSerializer, QuestionSerializer, ResponseSubmitSerializer,
+    ResponseDocumentSerializer, SurveyPurgeSerializer, SurveyComparisonSerializer,
+    SurveyCloneSerializer
 )
 
 
-def get_client_ip(request):
-    x_forwarded = request.META.get('HTTP_X_FORWARDED_FOR')
-    if x_forwarded:
-        return x_forwarded.split(',')[0].strip()
-    return request.META.get('REMOTE_ADDR')
-
-
 # ─────────────────────────────────────────
 # ADMIN — Survey CRUD
 # ─────────────────────────────────────────
@@ -32,7 +44,7 @@ class SurveyListCreateView(APIView):
     parser_classes = [MultiPartParser, FormParser, JSONParser]
 
     def get(self, request):
-        surveys = Survey.objects.all()
+        surveys = Survey.objects.exclude(status='deleting')
         serializer = SurveyListSerializer(surveys, many=True)
         return DRFResponse(serializer.data)
 
@@ -40,7 +52,8 @@ class SurveyListCreateView(APIView):
         serializer = SurveyWriteSerializer(data=request.data)
         if serializer.is_valid():
             survey = serializer.save(created_by=request.user)
-            return DRFResponse(SurveyDetailSerializer(survey, context={'request': request}).data,
+            approximate_results_changed(survey, was_enabled=False)
+            return DRFResponse(SurveyAdminDetailSerializer(survey, context={'request': request}).data,
                                status=status.HTTP_201_CREATED)
         return DRFResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -54,20 +67,61 @@ class SurveyDetailView(APIView):
 
     def get(self, request, pk):
         survey = self.get_object(pk)
-        return DRFResponse(SurveyDetailSerializer(survey, context={'request': request}).data)
+        return DRFResponse(SurveyAdminDetailSerializer(survey, context={'request': request}).data)
 
     def put(self, request, pk):
         survey = self.get_object(pk)
+        was_approximate = survey.approximate_results
         serializer = SurveyWriteSerializer(survey, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
-            return DRFResponse(SurveyDetailSerializer(survey, context={'request': request}).data)
+            approximate_results_changed(survey, was_approximate)
+            return DRFResponse(SurveyAdminDetailSerializer(survey, context={'request': request}).data)
         return DRFResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def delete(self, request, pk):
+        """Deletes in the background — poll purges/<id>/ for progress."""
         survey = self.get_object(pk)
-        survey.delete()
-        return DRFResponse(status=status.HTTP_204_NO_CONTENT)
+        job = start_purge(survey, 'survey', request.user)
+        if job.kind != 'survey':
+            return DRFResponse({'detail': 'A response purge is still running for this survey.'},
+                               status=status.HTTP_409_CONFLICT)
+        return DRFResponse(SurveyPurgeSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+
+class SurveyPurgeResponsesView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk):
+        """Remove every response of a survey in the background, keeping its questions."""
+        survey = get_object_or_404(Survey.objects.exclude(status='deleting'), pk=pk)
+        job = start_purge(survey, 'responses', request.user)
+        return DRFResponse(SurveyPurgeSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+
+class SurveyPurgeDetailView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        job = get_object_or_404(SurveyPurge, pk=pk)
+        # The admin polls this while a purge runs, which picks up one whose worker died
+        resume_if_stalled(job)
+        return DRFResponse(SurveyPurgeSerializer(job).data)
+
+
+class SurveyCloneView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk):
+        """Expects: { "title": "...", "slug": "...", "copy_responses": false } — all optional"""
+        survey = get_object_or_404(Survey.objects.exclude(status='deleting'), pk=pk)
+        serializer = SurveyCloneSerializer(data=request.data)
+        if not serializer.is_valid():
+            return DRFResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        clone = clone_survey(survey, user=request.user, **serializer.validated_data)
+        clone = Survey.objects.prefetch_related('questions__options').get(pk=clone.pk)
+        return DRFResponse(SurveyAdminDetailSerializer(clone, context={'request': request}).data,
+                           status=status.HTTP_201_CREATED)
 
 
 # ─────────────────────────────────────────
@@ -86,6 +140,7 @@ class QuestionCreateView(APIView):
         serializer = QuestionWriteSerializer(data=data)
         if serializer.is_valid():
             question = serializer.save(survey=survey)
+            touch_survey(survey.pk)
             return DRFResponse(QuestionSerializer(question).data, status=status.HTTP_201_CREATED)
         return DRFResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -98,12 +153,14 @@ class QuestionDetailView(APIView):
         serializer = QuestionWriteSerializer(question, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
+            touch_survey(question.survey_id)
             return DRFResponse(QuestionSerializer(question).data)
         return DRFResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def delete(self, request, pk):
         question = get_object_or_404(Question, pk=pk)
         question.delete()
+        touch_survey(question.survey_id)
         return DRFResponse(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -115,20 +172,35 @@ class QuestionReorderView(APIView):
         order = request.data.get('order', [])
         for index, q_id in enumerate(order):
             Question.objects.filter(pk=q_id, survey_id=survey_id).update(order=index)
+        touch_survey(survey_id)
         return DRFResponse({'status': 'reordered'})
 
 
+def touch_survey(survey_id):
+    """Bump updated_at after a question change, so the cached public payload is rebuilt."""
+    Survey.objects.filter(pk=survey_id).update(updated_at=timezone.now())
+
+
 # ─────────────────────────────────────────
 # PUBLIC — Survey by slug
 # ─────────────────────────────────────────
 
 class PublicSurveyView(APIView):
     permission_classes = [AllowAny]
+    throttle_classes = [SurveyViewThrottle]
 
     def get(self, request, slug):
         survey = get_object_or_404(Survey, slug=slug, status='active')
-        serializer = SurveyDetailSerializer(survey, context={'request': request})
-        return DRFResponse(serializer.data)
+        return cached_response(
+            request, self, public_survey_key(request, survey),
+            lambda: SurveyDetailSerializer(survey, context={'request': request}).data,
+            settings.PUBLIC_SURVEY_CACHE_SECONDS,
+        )
+
+
+def public_survey_key(request, survey):
+    # Cover image URLs are absolute, so the host is part of the key
+    return f'survey:{survey.pk}:{survey.updated_at.timestamp()}:{request.get_host()}'
 
 
 # ─────────────────────────────────────────
@@ -137,6 +209,7 @@ class PublicSurveyView(APIView):
 
 class SubmitResponseView(APIView):
     permission_classes = [AllowAny]
+    throttle_classes = [SurveySubmitThrottle]
 
     def post(self, request, slug):
         survey = get_object_or_404(Survey, slug=slug, status='active')
@@ -153,10 +226,21 @@ class SubmitResponseView(APIView):
         if not serializer.is_valid():
             return DRFResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        # Save response
+        save_response(survey, ip, serializer.validated_data['answers'])
+        return DRFResponse({'detail': 'Response submitted successfully.'}, status=status.HTTP_201_CREATED)
+
+
+def save_response(survey, ip, answers):
+    """
+    Store a validated submission — the response, its answers and, when enabled, its
+    answer document — in one transaction. Raises Http404 for a question outside the survey.
+    """
+    with transaction.atomic():
         response_obj = Response.objects.create(survey=survey, ip_address=ip)
+        doc = {}
+        texts = []
 
-        for ans_data in serializer.validated_data['answers']:
+        for ans_data in answers:
             question = get_object_or_404(Question, pk=ans_data['question_id'], survey=survey)
             answer = Answer.objects.create(
                 response=response_obj,
@@ -164,11 +248,27 @@ class SubmitResponseView(APIView):
                 text_answer=ans_data.get('text_answer', '')
             )
             option_ids = ans_data.get('option_ids', [])
+            options = []
             if option_ids:
-                options = AnswerOption.objects.filter(pk__in=option_ids, question=question)
+                options = list(AnswerOption.objects.filter(pk__in=option_ids, question=question))
                 answer.options.set(options)
 
-        return DRFResponse({'detail': 'Response submitted successfully.'}, status=status.HTTP_201_CREATED)
+            if question.question_type == 'text':
+                doc[str(question.id)] = answer.text_answer
+                if answer.text_answer:
+                    texts.append((question.id, answer.text_answer))
+            else:
+                doc[str(question.id)] = [opt.id for opt in options]
+
+        if settings.STORE_ANSWER_DOCUMENTS:
+            response_obj.answers_doc = doc
+            response_obj.save(update_fields=['answers_doc'])
+        if survey.approximate_results:
+            queue_response(survey, response_obj)
+
+    # The term index takes short row locks of its own, kept out of the submit transaction
+    index_answers(texts)
+    return response_obj
 
 
 # ─────────────────────────────────────────
@@ -179,51 +279,189 @@ class SurveyResultsView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request, slug):
-        survey = get_object_or_404(Survey, slug=slug)
+        survey = get_object_or_404(Survey.objects.exclude(status='deleting'), slug=slug)
 
         # If not admin and results hidden, block
         if not request.user.is_authenticated and not survey.show_results:
             return DRFResponse({'detail': 'Results are not public for this survey.'}, status=403)
 
-        total_responses = survey.responses.count()
-        results = []
-
-        for question in survey.questions.all():
-            q_data = {
-                'id':            question.id,
-                'heading':       question.heading,
-                'text':          question.text,
-                'question_type': question.question_type,
-                'options':       [],
-                'text_answers':  [],
-            }
-
-            if question.question_type in ['single', 'multiple']:
-                for option in question.options.all():
-                    count = Answer.objects.filter(
-                        question=question,
-                        options=option
-                    ).count()
-                    pct = round((count / total_responses * 100), 1) if total_responses > 0 else 0
-                    q_data['options'].append({
-                        'id':      option.id,
-                        'text':    option.text,
-                        'count':   count,
-                        'percent': pct,
-                    })
-            else:
-                # Open text — return all non-empty answers
-                text_answers = Answer.objects.filter(
-                    question=question
-                ).exclude(text_answer='').values_list('text_answer', flat=True)
-                q_data['text_answers'] = list(text_answers)
+        if request.user.is_authenticated:
+            return DRFResponse(results_payload(survey, request.query_params.get('mode') == 'exact'))
+        # Anonymous readers share one rendered, compressed copy for RESULTS_CACHE_SECONDS
+        return cached_response(request, self, f'results:{survey.pk}', lambda: results_payload(survey),
+                               settings.RESULTS_CACHE_SECONDS)
+
+
+def results_payload(survey, exact_requested=False):
+    """Approximate surveys serve the sample; admins can still ask for the exact counts."""
+    if survey.approximate_results and not exact_requested:
+        payload = approximate_results(survey)
+        if payload is not None:
+            return payload
+    return exact_results(survey)
+
+
+def exact_results(survey):
+    """
+    Full-count results payload, shared by the sync and async results views and the PDF.
+    Option counts and text answers come from one grouped query each.
+    """
+    total_responses = survey.responses.count()
+    option_counts = dict(
+        Answer.options.through.objects
+        .filter(answer__question__survey=survey)
+        .values_list('answeroption_id')
+        .annotate(count=Count('id'))
+    )
+    text_answers = {}
+    for question_id, text in (Answer.objects
+                              .filter(question__survey=survey, question__question_type='text')
+                              .exclude(text_answer='')
+                              .order_by('id')
+                              .values_list('question_id', 'text_answer')):
+        text_answers.setdefault(question_id, []).append(text)
+    terms = top_terms(survey)
+
+    results = []
+    for question in survey.questions.prefetch_related('options'):
+        q_data = {
+            'id':            question.id,
+            'heading':       question.heading,
+            'text':          question.text,
+            'question_type': question.question_type,
+            'options':       [],
+            'text_answers':  [],
+        }
+
+        if question.question_type in ['single', 'multiple']:
+            for option in question.options.all():
+                count = option_counts.get(option.id, 0)
+                pct = round((count / total_responses * 100), 1) if total_responses > 0 else 0
+                q_data['options'].append({
+                    'id':      option.id,
+                    'text':    option.text,
+                    'count':   count,
+                    'percent': pct,
+                })
+        else:
+            # Open text — return all non-empty answers
+            q_data['text_answers'] = text_answers.get(question.id, [])
+            q_data['top_terms'] = terms.get(question.id, {'terms': [], 'bigrams': []})
+
+        results.append(q_data)
+
+    return {
+        'survey_title':    survey.title,
+        'total_responses': total_responses,
+        'approximate':     False,
+        'results':         results,
+    }
+
+
+# ─────────────────────────────────────────
+# ADMIN — Response browser
+# ─────────────────────────────────────────
+
+def encode_cursor(response_obj):
+    raw = f'{response_obj.submitted_at.isoformat()}|{response_obj.pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Returns (submitted_at, id) or raises ValueError."""
+    raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+    submitted_at, pk = raw.split('|')
+    parsed = parse_datetime(submitted_at)
+    if parsed is None:
+        raise ValueError(cursor)
+    return parsed, int(pk)
+
+
+def parse_bound(value, end_of_day=False):
+    """
+    Accept a date or datetime query param and return (aware datetime, lookup). A bare `to` date
+    includes that whole day. Dates become local midnights so the range stays on the
+    submitted_at index instead of casting every row to a date.
+    """
+    parsed = parse_date(value)
+    if parsed is not None:
+        if end_of_day:
+            parsed += datetime.timedelta(days=1)
+        midnight = timezone.make_aware(datetime.datetime.combine(parsed, datetime.time.min))
+        return midnight, 'lt' if end_of_day else 'gte'
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise ValueError(value)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed, 'lte' if end_of_day else 'gte'
+
+
+class ResponseBrowserView(APIView):
+    permission_classes = [IsAuthenticated]
+    default_limit = 50
+    max_limit = 200
+
+    def get(self, request, pk):
+        """
+        Newest responses first, keyset-paginated on (submitted_at, id).
+        Query params: cursor, limit, from, to (date or datetime), option (repeatable —
+        only responses that selected every given option).
+        """
+        survey = get_object_or_404(Survey, pk=pk)
+        params = request.query_params
 
-            results.append(q_data)
+        try:
+            limit = min(int(params.get('limit', self.default_limit)), self.max_limit)
+        except ValueError:
+            return DRFResponse({'detail': 'limit must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+        if limit < 1:
+            return DRFResponse({'detail': 'limit must be positive.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        responses = survey.responses.all()
+
+        for param, end_of_day in [('from', False), ('to', True)]:
+            if params.get(param):
+                try:
+                    bound, lookup = parse_bound(params[param], end_of_day)
+                except ValueError:
+                    return DRFResponse({'detail': f'Invalid {param} date.'}, status=status.HTTP_400_BAD_REQUEST)
+                responses = responses.filter(**{f'submitted_at__{lookup}': bound})
+
+        try:
+            option_ids = [int(o) for o in params.getlist('option')]
+        except ValueError:
+            return DRFResponse({'detail': 'option must be an integer id.'}, status=status.HTTP_400_BAD_REQUEST)
+        for option_id in option_ids:
+            responses = responses.filter(Exists(
+                Answer.options.through.objects.filter(answer__response=OuterRef('pk'), answeroption_id=option_id)
+            ))
+
+        if params.get('cursor'):
+            try:
+                submitted_at, last_id = decode_cursor(params['cursor'])
+            except ValueError:
+                return DRFResponse({'detail': 'Invalid cursor.'}, status=status.HTTP_400_BAD_REQUEST)
+            responses = responses.filter(
+                Q(submitted_at__lt=submitted_at) | Q(submitted_at=submitted_at, pk__lt=last_id)
+            )
+
+        # The page is one scan of Response reading answer documents, plus the survey's questions
+        # and option texts; only responses saved without a document touch the answer tables
+        page = list(responses.order_by('-submitted_at', '-pk')
+                    .only('id', 'survey', 'ip_address', 'submitted_at', 'answers_doc')[:limit + 1])
+        has_more = len(page) > limit
+        page = page[:limit]
+        missing = [r.pk for r in page if r.answers_doc is None]
+        context = {
+            'questions':   list(survey.questions.all()),
+            'option_text': dict(AnswerOption.objects.filter(question__survey=survey).values_list('id', 'text')),
+            'fallback':    documents_for(Response.objects.filter(pk__in=missing)) if missing else {},
+        }
 
         return DRFResponse({
-            'survey_title':    survey.title,
-            'total_responses': total_responses,
-            'results':         results,
+            'results':     ResponseDocumentSerializer(page, many=True, context=context).data,
+            'next_cursor': encode_cursor(page[-1]) if has_more else None,
         })
 
 
@@ -236,7 +474,8 @@ class ExportCSVView(APIView):
 
     def get(self, request, pk):
         survey = get_object_or_404(Survey, pk=pk)
-        questions = survey.questions.all()
+        questions = list(survey.questions.all())
+        option_text = dict(AnswerOption.objects.filter(question__survey=survey).values_list('id', 'text'))
 
         output = io.StringIO()
         writer = csv.writer(output)
@@ -247,19 +486,24 @@ class ExportCSVView(APIView):
             header.append(q.text[:50])
         writer.writerow(header)
 
-        # Data rows
-        for i, resp in enumerate(survey.responses.all(), 1):
-            row = [i, resp.ip_address, resp.submitted_at.strftime('%Y-%m-%d %H:%M')]
+        # Data rows — a single scan over Response reading the answer documents.
+        # Rows saved before documents existed are rebuilt from the answer tables.
+        rows = list(survey.responses.values_list('pk', 'ip_address', 'submitted_at', 'answers_doc'))
+        missing = any(row[3] is None for row in rows)
+        fallback = documents_for(survey.responses.filter(answers_doc__isnull=True)) if missing else {}
+
+        for i, (resp_id, ip, submitted_at, doc) in enumerate(rows, 1):
+            if doc is None:
+                doc = fallback.get(resp_id, {})
+            row = [i, ip, submitted_at.strftime('%Y-%m-%d %H:%M')]
             for q in questions:
-                try:
-                    answer = resp.answers.get(question=q)
-                    if q.question_type == 'text':
-                        row.append(answer.text_answer)
-                    else:
-                        selected = ', '.join([opt.text for opt in answer.options.all()])
-                        row.append(selected)
-                except Answer.DoesNotExist:
+                value = doc.get(str(q.id))
+                if value is None:
                     row.append('')
+                elif q.question_type == 'text':
+                    row.append(value)
+                else:
+                    row.append(', '.join(option_text[opt_id] for opt_id in value if opt_id in option_text))
             writer.writerow(row)
 
         output.seek(0)
@@ -272,55 +516,72 @@ class ExportCSVView(APIView):
 # ADMIN — Export PDF
 # ─────────────────────────────────────────
 
-class ExportPDFView(APIView):
-    permission_classes = [IsAuthenticated]
-
-    def get(self, request, pk):
-        from reportlab.lib.pagesizes import A4
-        from reportlab.lib import colors
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-        from reportlab.lib.units import cm
-
-        survey = get_object_or_404(Survey, pk=pk)
-        buffer = io.BytesIO()
-
-        doc = SimpleDocTemplate(buffer, pagesize=A4,
-                                leftMargin=2*cm, rightMargin=2*cm,
-                                topMargin=2*cm, bottomMargin=2*cm)
-
-        GREEN  = colors.HexColor('#2E7D32')
-        BLUE   = colors.HexColor('#2B6CB0')
-        LGRAY  = colors.HexColor('#F5F6F8')
-        DTEXT  = colors.HexColor('#1A1A2E')
-
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle('Title', fontSize=20, textColor=GREEN, spaceAfter=6, fontName='Helvetica-Bold')
-        h2_style    = ParagraphStyle('H2',    fontSize=13, textColor=BLUE,  spaceAfter=4, fontName='Helvetica-Bold')
-        body_style  = ParagraphStyle('Body',  fontSize=10, textColor=DTEXT, spaceAfter=4, fontName='Helvetica')
-        small_style = ParagraphStyle('Small', fontSize=9,  textColor=colors.grey, fontName='Helvetica-Oblique')
-
-        story = []
-        story.append(Paragraph(f'Survey Results: {survey.title}', title_style))
-        story.append(Paragraph(f'Total responses: {survey.responses.count()}', small_style))
-        story.append(Spacer(1, 0.5*cm))
-
-        for question in survey.questions.all():
-            story.append(Paragraph(question.text, h2_style))
-            if question.heading:
-                story.append(Paragraph(question.heading, small_style))
-
-            if question.question_type in ['single', 'multiple']:
-                total = survey.responses.count()
-                data = [['Option', 'Responses', '%']]
-                for opt in question.options.all():
-                    count = Answer.objects.filter(question=question, options=opt).count()
-                    pct = f'{round(count/total*100, 1)}%' if total > 0 else '0%'
-                    data.append([opt.text, str(count), pct])
-
-                t = Table(data, colWidths=[10*cm, 3*cm, 3*cm])
+def render_results_pdf(survey):
+    """Build the results PDF for a survey and return it as bytes."""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib import colors
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+    from reportlab.lib.units import cm
+
+    buffer = io.BytesIO()
+
+    doc = SimpleDocTemplate(buffer, pagesize=A4,
+                            leftMargin=2*cm, rightMargin=2*cm,
+                            topMargin=2*cm, bottomMargin=2*cm)
+
+    GREEN  = colors.HexColor('#2E7D32')
+    BLUE   = colors.HexColor('#2B6CB0')
+    LGRAY  = colors.HexColor('#F5F6F8')
+    DTEXT  = colors.HexColor('#1A1A2E')
+
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle('Title', fontSize=20, textColor=GREEN, spaceAfter=6, fontName='Helvetica-Bold')
+    h2_style    = ParagraphStyle('H2',    fontSize=13, textColor=BLUE,  spaceAfter=4, fontName='Helvetica-Bold')
+    body_style  = ParagraphStyle('Body',  fontSize=10, textColor=DTEXT, spaceAfter=4, fontName='Helvetica')
+    small_style = ParagraphStyle('Small', fontSize=9,  textColor=colors.grey, fontName='Helvetica-Oblique')
+
+    payload = exact_results(survey)
+
+    story = []
+    story.append(Paragraph(f'Survey Results: {survey.title}', title_style))
+    story.append(Paragraph(f'Total responses: {payload["total_responses"]}', small_style))
+    story.append(Spacer(1, 0.5*cm))
+
+    for question in payload['results']:
+        story.append(Paragraph(question['text'], h2_style))
+        if question['heading']:
+            story.append(Paragraph(question['heading'], small_style))
+
+        if question['question_type'] in ['single', 'multiple']:
+            data = [['Option', 'Responses', '%']]
+            for opt in question['options']:
+                data.append([opt['text'], str(opt['count']), f'{opt["percent"]}%'])
+
+            t = Table(data, colWidths=[10*cm, 3*cm, 3*cm])
+            t.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), GREEN),
+                ('TEXTCOLOR',  (0, 0), (-1, 0), colors.white),
+                ('FONTNAME',   (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTSIZE',   (0, 0), (-1, -1), 9),
+                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, LGRAY]),
+                ('GRID',       (0, 0), (-1, -1), 0.5, colors.lightgrey),
+                ('LEFTPADDING', (0, 0), (-1, -1), 8),
+            ]))
+            story.append(t)
+        else:
+            question_terms = question['top_terms']
+            if question_terms and question_terms['terms']:
+                story.append(Paragraph('Top terms', small_style))
+                data = [['Term', 'Count', 'Phrase', 'Count']]
+                for i in range(len(question_terms['terms'])):
+                    term = question_terms['terms'][i]
+                    bigram = question_terms['bigrams'][i] if i < len(question_terms['bigrams']) else None
+                    data.append([term['term'], str(term['count']),
+                                 bigram['term'] if bigram else '', str(bigram['count']) if bigram else ''])
+                t = Table(data, colWidths=[5*cm, 2.5*cm, 6*cm, 2.5*cm])
                 t.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), GREEN),
+                    ('BACKGROUND', (0, 0), (-1, 0), BLUE),
                     ('TEXTCOLOR',  (0, 0), (-1, 0), colors.white),
                     ('FONTNAME',   (0, 0), (-1, 0), 'Helvetica-Bold'),
                     ('FONTSIZE',   (0, 0), (-1, -1), 9),
@@ -329,29 +590,73 @@ class ExportPDFView(APIView):
                     ('LEFTPADDING', (0, 0), (-1, -1), 8),
                 ]))
                 story.append(t)
-            else:
-                answers = Answer.objects.filter(question=question).exclude(text_answer='')
-                for ans in answers:
-                    story.append(Paragraph(f'• {ans.text_answer}', body_style))
+                story.append(Spacer(1, 0.3*cm))
 
-            story.append(Spacer(1, 0.4*cm))
+            for text in question['text_answers']:
+                story.append(Paragraph(f'• {text}', body_style))
+
+        story.append(Spacer(1, 0.4*cm))
+
+    doc.build(story)
+    return buffer.getvalue()
+
+
+class ExportPDFView(APIView):
+    permission_classes = [IsAuthenticated]
 
-        doc.build(story)
-        buffer.seek(0)
-        response = HttpResponse(buffer, content_type='application/pdf')
+    def get(self, request, pk):
+        survey = get_object_or_404(Survey, pk=pk)
+        response = HttpResponse(render_results_pdf(survey), content_type='application/pdf')
         response['Content-Disposition'] = f'attachment; filename="{survey.slug}-results.pdf"'
         return response
 
 
+# ─────────────────────────────────────────
+# ADMIN — Cross-survey comparison
+# ─────────────────────────────────────────
+
+class SurveyComparisonView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        """Expects: { "surveys": [id1, id2, ...], "mapping": [{"label": "...", "questions": {"id1": q_id}}] }"""
+        serializer = SurveyComparisonSerializer(data=request.data)
+        if not serializer.is_valid():
+            return DRFResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        survey_ids = serializer.validated_data['surveys']
+        mapping = serializer.validated_data.get('mapping')
+
+        found = Survey.objects.exclude(status='deleting').in_bulk(survey_ids)
+        missing = [pk for pk in survey_ids if pk not in found]
+        if missing:
+            return DRFResponse({'surveys': [f'Unknown survey ids: {missing}']}, status=status.HTTP_400_BAD_REQUEST)
+        surveys = [found[pk] for pk in survey_ids]
+
+        # One cache entry per survey set and mapping; editing any of the surveys starts a new one
+        request_hash = hashlib.sha1(json.dumps([survey_ids, mapping], sort_keys=True).encode()).hexdigest()
+        last_edit = max(s.updated_at for s in surveys).timestamp()
+        return cached_response(
+            request, self, f'compare:{request_hash}:{last_edit}',
+            lambda: compare_surveys(surveys, mapping), settings.COMPARISON_CACHE_SECONDS,
+        )
+
+
 # ─────────────────────────────────────────
 # ADMIN — Dashboard stats
 # ─────────────────────────────────────────
 
+class ThrottleStatsView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        return DRFResponse(throttle_stats())
+
+
 class DashboardStatsView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        total_surveys   = Survey.objects.count()
+        total_surveys   = Survey.objects.exclude(status='deleting').count()
         active_surveys  = Survey.objects.filter(status='active').count()
         total_responses = Response.objects.count()
         return DRFResponse({
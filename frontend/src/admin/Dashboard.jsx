@@ -1,7 +1,7 @@
 import { useState, useEffect } from 'react'
 import { useNavigate, Link } from 'react-router-dom'
 import toast from 'react-hot-toast'
-import { getSurveys, getDashboardStats, deleteSurvey } from '../api'
+import { getSurveys, getDashboardStats, deleteSurvey, cloneSurvey } from '../api'
 
 export default function Dashboard() {
   const [surveys, setSurveys]   = useState([])
@@ -29,6 +29,14 @@ export default function Dashboard() {
     } catch { toast.error('Failed to delete survey') }
   }
 
+  async function handleDuplicate(id) {
+    try {
+      const { data } = await cloneSurvey(id)
+      toast.success('Survey duplicated')
+      navigate(`/admin/surveys/${data.id}/edit`)
+    } catch { toast.error('Failed to duplicate survey') }
+  }
+
   const statusLabel = s => ({ active: 'Active', draft: 'Draft', closed: 'Closed' }[s] || s)
   const statusClass = s => ({ active: 'pill-active', draft: 'pill-draft', closed: 'pill-closed' }[s])
 
@@ -108,6 +116,7 @@ export default function Dashboard() {
                       <div style={{ display: 'flex', gap: 6 }}>
                         <button className="btn btn-outline btn-sm" onClick={() => navigate(`/admin/surveys/${s.id}/results`)}>Results</button>
                         <button className="btn btn-outline btn-sm" onClick={() => navigate(`/admin/surveys/${s.id}/edit`)}>Edit</button>
+                        <button className="btn btn-outline btn-sm" onClick={() => handleDuplicate(s.id)}>Duplicate</button>
                         <button className="btn btn-danger btn-sm"  onClick={() => handleDelete(s.id, s.title)}>Delete</button>
                       </div>
                     </td>
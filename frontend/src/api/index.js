@@ -32,6 +32,9 @@ export const getSurvey         = (id) => api.get(`/surveys/${id}/`)
 export const createSurvey      = (data) => api.post('/surveys/', data, { headers: { 'Content-Type': 'multipart/form-data' } })
 export const updateSurvey      = (id, data) => api.put(`/surveys/${id}/`, data, { headers: { 'Content-Type': 'multipart/form-data' } })
 export const deleteSurvey      = (id) => api.delete(`/surveys/${id}/`)
+export const cloneSurvey       = (id, data = {}) => api.post(`/surveys/${id}/clone/`, data)
+export const purgeResponses    = (id) => api.post(`/surveys/${id}/responses/purge/`)
+export const getPurge          = (id) => api.get(`/purges/${id}/`)
 
 // ── Admin questions
 export const addQuestion     = (surveyId, data) => api.post(`/surveys/${surveyId}/questions/`, data)
@@ -41,6 +44,8 @@ export const reorderQuestions = (surveyId, order) => api.post(`/surveys/${survey
 
 // ── Admin results & export
 export const getResults  = (slug) => api.get(`/surveys/${slug}/results/`)
+export const getResponses = (id, params) => api.get(`/surveys/${id}/responses/`, { params })
+export const compareSurveys = (surveys, mapping) => api.post('/surveys/compare/', mapping ? { surveys, mapping } : { surveys })
 export const exportCSV   = (id)   => `/api/surveys/${id}/export/csv/`
 export const exportPDF   = (id)   => `/api/surveys/${id}/export/pdf/`
 